@@ -0,0 +1,18 @@
+# alpaca_config.py
+# Alpaca credentials and endpoints shared by the live engine and backtest
+
+import os
+
+ALPACA_KEY    = os.getenv("APCA_API_KEY_ID", "").strip()
+ALPACA_SECRET = os.getenv("APCA_API_SECRET_KEY", "").strip()
+
+HEADERS = {
+    "APCA-API-KEY-ID":     ALPACA_KEY,
+    "APCA-API-SECRET-KEY": ALPACA_SECRET
+}
+
+BARS_URL        = "https://data.alpaca.markets/v2/stocks/{}/bars"
+MULTI_BARS_URL  = "https://data.alpaca.markets/v2/stocks/bars"
+QUOTE_URL       = "https://data.alpaca.markets/v2/stocks/{}/quotes/latest"
+MULTI_QUOTE_URL = "https://data.alpaca.markets/v2/stocks/quotes/latest"
+CLOCK_URL       = "https://paper-api.alpaca.markets/v2/clock"
@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from main import get_signal
+import main
 
 app = FastAPI()
 
@@ -9,4 +9,5 @@ def root():
 
 @app.get("/signal")
 def signal():
-    return {"signal": get_signal()}
+    with main.state_lock:
+        return {"signal": list(main.all_signals)}
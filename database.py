@@ -1,41 +1,50 @@
 import sqlite3
+import threading
 from datetime import datetime
 
 DB_NAME = "trades.db"
 
+INSERT_TRADE = """
+    INSERT INTO trades
+    (timestamp, ticker, mode, bias, entry, stop, target, probability, vol_regime, outcome, r_multiple)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_conn = None
+_lock = threading.Lock()
+
+
+def get_conn():
+    # One long-lived autocommit connection in WAL mode
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_NAME, check_same_thread=False,
+                                isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+    return _conn
+
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT,
-            ticker TEXT,
-            mode TEXT,
-            bias TEXT,
-            entry REAL,
-            stop REAL,
-            target REAL,
-            probability INTEGER,
-            vol_regime TEXT,
-            outcome TEXT,
-            r_multiple REAL
-        )
-    """)
-
-    conn.commit()
-    conn.close()
+    with _lock:
+        get_conn().execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                ticker TEXT,
+                mode TEXT,
+                bias TEXT,
+                entry REAL,
+                stop REAL,
+                target REAL,
+                probability INTEGER,
+                vol_regime TEXT,
+                outcome TEXT,
+                r_multiple REAL
+            )
+        """)
 
-def log_trade(ticker, mode, bias, entry, stop, target, probability, vol_regime):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-
-    c.execute("""
-        INSERT INTO trades 
-        (timestamp, ticker, mode, bias, entry, stop, target, probability, vol_regime, outcome, r_multiple)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+def _trade_row(ticker, mode, bias, entry, stop, target, probability, vol_regime):
+    return (
         datetime.utcnow().isoformat(),
         ticker,
         mode,
@@ -47,7 +56,28 @@ def log_trade(ticker, mode, bias, entry, stop, target, probability, vol_regime):
         vol_regime,
         None,
         None
-    ))
+    )
+
+def log_trade(ticker, mode, bias, entry, stop, target, probability, vol_regime):
+    with _lock:
+        get_conn().execute(INSERT_TRADE, _trade_row(
+            ticker, mode, bias, entry, stop, target, probability, vol_regime))
 
-    conn.commit()
-    conn.close()
+def log_trades_bulk(rows):
+    """
+    Insert many trades in a single transaction (one commit for the batch).
+    rows: iterable of (ticker, mode, bias, entry, stop, target,
+          probability, vol_regime) tuples.
+    """
+    params = [_trade_row(*r) for r in rows]
+    if not params:
+        return
+    with _lock:
+        conn = get_conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(INSERT_TRADE, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
@@ -1,37 +1,107 @@
-from flask import Flask, jsonify, render_template_string, request, redirect
+from flask import Flask, Response, jsonify, request, redirect
+from flask.json.provider import DefaultJSONProvider
 import requests
 import os
-import statistics
 import threading
 import time
+import hashlib
 import json
+import queue
 import sqlite3
-from datetime import datetime
-import pytz
+import string
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from urllib3.util.retry import Retry
+
+try:
+    import orjson as fast_json    # C parser for the larger bar payloads
+except ImportError:
+    fast_json = json
+
+from alpaca_config import (ALPACA_KEY, ALPACA_SECRET, HEADERS,
+                           BARS_URL, MULTI_BARS_URL, QUOTE_URL,
+                           MULTI_QUOTE_URL, CLOCK_URL)
 
 # =============================================
 # APP SETUP
 # =============================================
 
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() via orjson; anything orjson can't encode takes the stdlib path."""
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return fast_json.dumps(obj, option=fast_json.OPT_SORT_KEYS |
+                                   fast_json.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return fast_json.loads(s)
+
+
 app = Flask(__name__)
+if fast_json is not json:
+    app.json = FastJSONProvider(app)
 
 ACCOUNT_SIZE  = 30000
 SCAN_INTERVAL = 300
 ORB_BARS      = 6       # 30 min ORB (6 x 5min bars) - institutional standard
 
+OPTION_CANDIDATES = 3   # top breakouts per scan priced against the chain
+
 SYMBOLS = ["SPY", "QQQ", "AAPL", "NVDA", "TSLA", "AMD", "META", "MSFT", "AMZN"]
 
-ALPACA_KEY    = os.getenv("APCA_API_KEY_ID", "").strip()
-ALPACA_SECRET = os.getenv("APCA_API_SECRET_KEY", "").strip()
+# Market hours (US/Eastern)
+ET           = ZoneInfo("America/New_York")
+MARKET_OPEN  = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+# Pooled keep-alive sessions. Telegram and Tradier get their own sessions
+# so the Alpaca key headers are never sent to other hosts.
+# Transient 429/5xx responses are retried with a short backoff.
+RETRY = Retry(total=2, backoff_factor=0.2,
+              status_forcelist=(429, 500, 502, 503, 504))
+
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=8, pool_maxsize=32, max_retries=RETRY))
+
+TG_SESSION = requests.Session()
+TG_SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=2, pool_maxsize=4))
+
+# Telegram - token, endpoints and token validation resolved once at import
+TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
+TG_SEND_URL      = "https://api.telegram.org/bot{}/sendMessage".format(TELEGRAM_TOKEN)
+TG_UPDATES_URL   = "https://api.telegram.org/bot{}/getUpdates".format(TELEGRAM_TOKEN)
+
+# Messages queued within TG_BATCH_WINDOW seconds of each other go out as
+# one sendMessage, capped at Telegram's 4096-character message limit
+TG_BATCH_WINDOW = 0.25
+TG_BATCH_SEP    = "\n---\n"
+TG_MAX_LEN      = 4096
+
+
+def telegram_config_error(token, chat_id):
+    """Returns a reason string if the Telegram config is unusable, else None."""
+    if not token or not chat_id:
+        return "Telegram not configured"
+    # Validate token format: must contain exactly one colon
+    if token.count(":") != 1:
+        return "Telegram token malformed - must contain exactly one colon"
+    bot_id, bot_hash = token.split(":", 1)
+    if not bot_id.isdigit():
+        return "Telegram token malformed - part before colon must be numeric"
+    return None
 
-HEADERS = {
-    "APCA-API-KEY-ID":     ALPACA_KEY,
-    "APCA-API-SECRET-KEY": ALPACA_SECRET
-}
 
-DATA_URL  = "https://data.alpaca.markets/v2/stocks/{}/bars"
-QUOTE_URL = "https://data.alpaca.markets/v2/stocks/{}/quotes/latest"
-CLOCK_URL = "https://paper-api.alpaca.markets/v2/clock"
+TG_CONFIG_ERROR = telegram_config_error(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
 
 # Tradier - options data source (real ATM 0DTE chains)
 TRADIER_TOKEN   = os.getenv("TRADIER_TOKEN", "").strip()
@@ -41,36 +111,88 @@ TRADIER_HEADERS = {
     "Accept":        "application/json"
 }
 
-ALERT_FILE = "/tmp/last_alert.json"
+TRADIER_SESSION = requests.Session()
+TRADIER_SESSION.headers.update(TRADIER_HEADERS)
+TRADIER_SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=2, pool_maxsize=16, max_retries=RETRY))
+
 DB_FILE    = "/tmp/trades.db"
 
 state_lock   = threading.Lock()
-debug_log    = []
+debug_log    = deque(maxlen=150)   # oldest entries evicted on append
 all_signals  = []
 next_scan_at = 0
 bot_enabled  = True
 
+# Snapshot refreshed by the scanner thread so the dashboard never blocks
+# on Alpaca: market clock state and last price per open-trade symbol
+market_is_open = False
+open_prices    = {}
+
 
 # =============================================
 # LOGGING
 # =============================================
 
+# (epoch second, "HH:MM:SS") - a scan logs dozens of lines per second, so
+# the UTC stamp is formatted once per second. Rebinding the tuple is atomic.
+_log_stamp = (0, "")
+
+
 def log(msg):
-    ts    = datetime.now(pytz.utc).strftime("%H:%M:%S")
-    entry = "[{}] {}".format(ts, msg)
+    global _log_stamp
+    now = int(time.time())
+    if now != _log_stamp[0]:
+        _log_stamp = (now, time.strftime("%H:%M:%S", time.gmtime(now)))
+    entry = "[{}] {}".format(_log_stamp[1], msg)
     print(entry)
-    with state_lock:
-        debug_log.append(entry)
-        if len(debug_log) > 150:
-            debug_log.pop(0)
+    debug_log.append(entry)   # atomic under the GIL; no lock needed
+
+
+def recent_logs(n):
+    """
+    Last n debug_log entries, oldest first. Copies the deque before
+    slicing, so a concurrent append can't interrupt the read.
+    """
+    return list(debug_log)[-n:]
+
+
+def et_today():
+    """Today's ET date as YYYY-MM-DD."""
+    return datetime.now(ET).date().isoformat()
 
 
 # =============================================
 # DATABASE
 # =============================================
 
+_tls = threading.local()   # per-thread long-lived connection
+
+trades_version = 0   # bumped on every trade insert/close; keys the dashboard cache
+
+
+def get_conn():
+    """
+    This thread's connection to DB_FILE, opened and tuned on first use.
+    WAL lets dashboard reads run alongside scanner writes; synchronous=NORMAL
+    drops the fsync on every commit. Writers wrap their statements in
+    `with conn:` so each call is still one committed transaction.
+    """
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")
+        conn.row_factory = sqlite3.Row   # rows index by name or position
+        _tls.conn = conn
+    return conn
+
+
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
+    conn = get_conn()
     c    = conn.cursor()
     c.execute("""
         CREATE TABLE IF NOT EXISTS signals (
@@ -109,6 +231,12 @@ def init_db():
             entry_hour REAL
         )
     """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS kv (
+            k TEXT PRIMARY KEY,
+            v TEXT
+        )
+    """)
     # Migrate existing tables that may not have new columns
     for col, coltype in [("grade","TEXT"), ("grade_pts","INTEGER"),
                           ("gap_pct","REAL"), ("gap_dir","TEXT"),
@@ -117,55 +245,71 @@ def init_db():
             conn.execute("ALTER TABLE trades ADD COLUMN {} {}".format(col, coltype))
         except:
             pass
+    # Dashboard lookups: today's trades by ts range; open trades by outcome,
+    # already in ts DESC order so the ORDER BY needs no sort
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts)")
+    c.execute("DROP INDEX IF EXISTS idx_trades_open")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trades_outcome_ts "
+              "ON trades(outcome, ts DESC)")
     conn.commit()
-    conn.close()
+    conn.execute("ANALYZE")
 
 
-def db_log_signal(sig):
+def db_log_signals(sigs, last_alert=None):
+    """
+    Record fired signals with one executemany in a single transaction.
+    When last_alert is given, the alert dedup state is written in that same
+    transaction, so everything lands in one commit.
+    """
+    ts = datetime.now(timezone.utc).isoformat()
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c    = conn.cursor()
-        c.execute("""
-            INSERT INTO signals
-            (ts,symbol,direction,price,score,premium,strike,contracts,stop,target)
-            VALUES (?,?,?,?,?,?,?,?,?,?)
-        """, (
-            datetime.now(pytz.utc).isoformat(),
-            sig.get("symbol"), sig.get("direction"),
-            sig.get("price"),  sig.get("score"),
-            sig.get("premium"), str(sig.get("strike","")),
-            sig.get("contracts"), sig.get("stop"), sig.get("target")
-        ))
-        conn.commit()
-        conn.close()
+        with get_conn() as conn:
+            conn.executemany("""
+                INSERT INTO signals
+                (ts,symbol,direction,price,score,premium,strike,contracts,stop,target)
+                VALUES (?,?,?,?,?,?,?,?,?,?)
+            """, [(
+                ts,
+                sig.get("symbol"), sig.get("direction"),
+                sig.get("price"),  sig.get("score"),
+                sig.get("premium"), str(sig.get("strike","")),
+                sig.get("contracts"), sig.get("stop"), sig.get("target")
+            ) for sig in sigs])
+            if last_alert is not None:
+                save_last_alert(conn, *last_alert)
     except Exception as e:
         log("DB signal log error: {}".format(e))
 
 
+def db_log_signal(sig, last_alert=None):
+    db_log_signals([sig], last_alert)
+
+
+def bump_trades_version():
+    global trades_version
+    trades_version += 1
+
+
 def db_log_trade(symbol, direction, premium, contracts, stop, target,
                   grade=None, grade_pts=None, gap_pct=None,
                   gap_dir=None, rs=None, entry_hour=None):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c    = conn.cursor()
-        et   = pytz.timezone("America/New_York")
         if entry_hour is None:
-            now        = datetime.now(et)
+            now        = datetime.now(ET)
             entry_hour = round(now.hour + now.minute / 60.0, 2)
-        c.execute("""
-            INSERT INTO trades
-            (ts,symbol,direction,premium,contracts,stop,target,outcome,
-             grade,grade_pts,gap_pct,gap_dir,rs,entry_hour)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, (
-            datetime.now(pytz.utc).isoformat(),
-            symbol, direction, premium, contracts, stop, target, "OPEN",
-            grade, grade_pts, gap_pct, gap_dir, rs, entry_hour
-        ))
-        trade_id = c.lastrowid
-        conn.commit()
-        conn.close()
-        return trade_id
+        with get_conn() as conn:
+            c = conn.execute("""
+                INSERT INTO trades
+                (ts,symbol,direction,premium,contracts,stop,target,outcome,
+                 grade,grade_pts,gap_pct,gap_dir,rs,entry_hour)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            """, (
+                datetime.now(timezone.utc).isoformat(),
+                symbol, direction, premium, contracts, stop, target, "OPEN",
+                grade, grade_pts, gap_pct, gap_dir, rs, entry_hour
+            ))
+        bump_trades_version()
+        return c.lastrowid
     except Exception as e:
         log("DB trade log error: {}".format(e))
         return None
@@ -173,97 +317,110 @@ def db_log_trade(symbol, direction, premium, contracts, stop, target,
 
 def db_close_trade(trade_id, exit_price, outcome):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c    = conn.cursor()
-        c.execute("SELECT premium, contracts FROM trades WHERE id=?", (trade_id,))
-        row = c.fetchone()
-        if not row:
-            conn.close()
-            return
-        premium, contracts = row
-        pnl    = (exit_price - premium) * 100 * contracts
-        r_mult = (exit_price - premium) / (premium * 0.45)
-        c.execute("""
-            UPDATE trades SET outcome=?, exit_price=?, pnl=?, r_mult=?
-            WHERE id=?
-        """, (outcome, exit_price, round(pnl, 2), round(r_mult, 2), trade_id))
-        conn.commit()
-        conn.close()
+        with get_conn() as conn:
+            row = conn.execute("SELECT premium, contracts FROM trades WHERE id=?",
+                               (trade_id,)).fetchone()
+            if not row:
+                return
+            premium, contracts = row
+            pnl    = (exit_price - premium) * 100 * contracts
+            r_mult = (exit_price - premium) / (premium * 0.45)
+            conn.execute("""
+                UPDATE trades SET outcome=?, exit_price=?, pnl=?, r_mult=?
+                WHERE id=?
+            """, (outcome, exit_price, round(pnl, 2), round(r_mult, 2), trade_id))
+        bump_trades_version()
         log("Trade {} closed: {} pnl={}".format(trade_id, outcome, round(pnl,2)))
     except Exception as e:
         log("DB close trade error: {}".format(e))
 
 
-def db_get_today_trades():
+def db_get_open_trades():
     try:
-        et    = pytz.timezone("America/New_York")
-        today = datetime.now(et).strftime("%Y-%m-%d")
-        conn  = sqlite3.connect(DB_FILE)
-        c     = conn.cursor()
+        c = get_conn().cursor()
         c.execute("""
-            SELECT id,symbol,direction,premium,contracts,stop,target,
-                   outcome,exit_price,pnl,r_mult,ts
-            FROM trades WHERE ts LIKE ?
+            SELECT id,symbol,direction,premium,contracts,stop,target,ts
+            FROM trades WHERE outcome='OPEN'
             ORDER BY ts DESC
-        """, (today + "%",))
-        rows = c.fetchall()
-        conn.close()
-        cols = ["id","symbol","direction","premium","contracts","stop",
-                "target","outcome","exit_price","pnl","r_mult","ts"]
-        return [dict(zip(cols, r)) for r in rows]
+        """)
+        return c.fetchall()
     except Exception as e:
-        log("DB get trades error: {}".format(e))
+        log("DB open trades error: {}".format(e))
         return []
 
 
-def db_get_open_trades():
+def db_get_dashboard_snapshot():
+    """
+    Everything the dashboard reads from SQLite on one connection:
+    (open trades, today's closed trades, (total_pnl, wins, losses, n_closed)).
+    Trades are sqlite3.Row objects, indexable by column name.
+    The totals come from one aggregate query.
+    """
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c    = conn.cursor()
-        c.execute("""
+        today    = datetime.now(ET).date()
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        today    = today.isoformat()
+        conn     = get_conn()
+        open_trades = conn.execute("""
             SELECT id,symbol,direction,premium,contracts,stop,target,ts
             FROM trades WHERE outcome='OPEN'
             ORDER BY ts DESC
-        """)
-        rows = c.fetchall()
-        conn.close()
-        cols = ["id","symbol","direction","premium","contracts","stop","target","ts"]
-        return [dict(zip(cols, r)) for r in rows]
+        """).fetchall()
+        closed = conn.execute("""
+            SELECT id,symbol,direction,premium,contracts,stop,target,
+                   outcome,exit_price,pnl,r_mult,ts
+            FROM trades WHERE ts >= ? AND ts < ? AND outcome != 'OPEN'
+            ORDER BY ts DESC
+        """, (today, tomorrow)).fetchall()
+        totals = tuple(conn.execute("""
+            SELECT COALESCE(SUM(pnl), 0), COALESCE(SUM(outcome='WIN'), 0),
+                   COALESCE(SUM(outcome='LOSS'), 0), COUNT(*)
+            FROM trades WHERE ts >= ? AND ts < ? AND outcome != 'OPEN'
+        """, (today, tomorrow)).fetchone())
+        return open_trades, closed, totals
     except Exception as e:
-        log("DB open trades error: {}".format(e))
-        return []
+        log("DB dashboard snapshot error: {}".format(e))
+        return [], [], (0, 0, 0, 0)
 
 
 # =============================================
 # ALERT PERSISTENCE
 # =============================================
 
+_last_alert = None   # in-memory mirror of kv['last_alert']: (alert_id, date)
+
 def load_last_alert():
-    try:
-        with open(ALERT_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("alert_id", ""), data.get("date", "")
-    except:
-        return "", ""
+    # The DB is read once (first call after start); later reads hit memory
+    global _last_alert
+    if _last_alert is None:
+        try:
+            row  = get_conn().execute(
+                "SELECT v FROM kv WHERE k='last_alert'").fetchone()
+            data = json.loads(row[0]) if row else {}
+            _last_alert = (data.get("alert_id", ""), data.get("date", ""))
+        except Exception:
+            _last_alert = ("", "")
+    return _last_alert
 
 
-def save_last_alert(alert_id, date_str):
-    try:
-        with open(ALERT_FILE, "w") as f:
-            json.dump({"alert_id": alert_id, "date": date_str}, f)
-    except Exception as e:
-        log("Could not save alert state: {}".format(e))
+def save_last_alert(conn, alert_id, date_str):
+    """Write alert state inside the caller's transaction (no commit here)."""
+    conn.execute("INSERT OR REPLACE INTO kv (k, v) VALUES ('last_alert', ?)",
+                 (json.dumps({"alert_id": alert_id, "date": date_str}),))
 
 
-def should_alert(symbol, direction):
-    et       = pytz.timezone("America/New_York")
-    today    = datetime.now(et).strftime("%Y-%m-%d")
+def should_alert(symbol, direction, today=None):
+    # Callers looping over a scan's signals pass the ET date in once
+    if today is None:
+        today = et_today()
     alert_id = "{}_{}".format(symbol, direction)
     saved_id, saved_date = load_last_alert()
     if saved_id == alert_id and saved_date == today:
         log("Alert suppressed: same signal already sent today")
         return False
-    save_last_alert(alert_id, today)
+    # Memory only; db_log_signal persists it alongside the signal row
+    global _last_alert
+    _last_alert = (alert_id, today)
     return True
 
 
@@ -271,24 +428,29 @@ def should_alert(symbol, direction):
 # TELEGRAM
 # =============================================
 
+_tg_queue = queue.Queue()
+
 def send_telegram(message):
-    token   = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-    chat_id = os.getenv("TELEGRAM_CHAT_ID", "").strip()
-    if not token or not chat_id:
-        log("Telegram not configured")
-        return False
-    # Validate token format: must contain exactly one colon
-    if token.count(":") != 1:
-        log("Telegram token malformed - must contain exactly one colon")
+    """
+    Queue message for the telegram_sender thread so scans and routes never
+    wait on api.telegram.org. Returns False if Telegram is not configured.
+    """
+    if TG_CONFIG_ERROR:
+        log(TG_CONFIG_ERROR)
         return False
-    bot_id, bot_hash = token.split(":", 1)
-    if not bot_id.isdigit():
-        log("Telegram token malformed - part before colon must be numeric")
+    _tg_queue.put(message)
+    return True
+
+
+def post_telegram(message):
+    """Send message synchronously; returns True on HTTP 200."""
+    if TG_CONFIG_ERROR:
+        log(TG_CONFIG_ERROR)
         return False
-    url = "https://api.telegram.org/bot{}/sendMessage".format(token)
     try:
-        resp = requests.post(url, json={"chat_id": chat_id, "text": message},
-                             timeout=10)
+        resp = TG_SESSION.post(TG_SEND_URL,
+                               json={"chat_id": TELEGRAM_CHAT_ID, "text": message},
+                               timeout=10)
         log("Telegram HTTP {}: {}".format(resp.status_code, resp.text[:150]))
         return resp.status_code == 200
     except Exception as e:
@@ -297,15 +459,14 @@ def send_telegram(message):
 
 
 def get_telegram_updates(offset=0):
-    token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-    if not token:
+    if not TELEGRAM_TOKEN:
         return [], offset
     try:
-        url  = "https://api.telegram.org/bot{}/getUpdates".format(token)
-        resp = requests.get(url, params={"offset": offset, "timeout": 10}, timeout=15)
+        resp = TG_SESSION.get(TG_UPDATES_URL,
+                              params={"offset": offset, "timeout": 25}, timeout=30)
         if resp.status_code != 200:
             return [], offset
-        updates    = resp.json().get("result", [])
+        updates    = fast_json.loads(resp.content).get("result", [])
         new_offset = offset
         if updates:
             new_offset = updates[-1]["update_id"] + 1
@@ -314,89 +475,154 @@ def get_telegram_updates(offset=0):
         return [], offset
 
 
-def handle_telegram_command(text):
+def cmd_stop():
     global bot_enabled
-    text = text.strip().lower()
+    bot_enabled = False
+    send_telegram("Bot PAUSED. Send /start to resume scanning.")
 
-    if text in ("/stop", "stop"):
-        bot_enabled = False
-        send_telegram("Bot PAUSED. Send /start to resume scanning.")
 
-    elif text in ("/start", "start"):
-        bot_enabled = True
-        send_telegram("Bot RESUMED. Scanning every 5 minutes.")
+def cmd_start():
+    global bot_enabled
+    bot_enabled = True
+    send_telegram("Bot RESUMED. Scanning every 5 minutes.")
 
-    elif text in ("/status", "status"):
-        with state_lock:
-            sigs = list(all_signals)
-        active = [s for s in sigs if s.get("status") in ("SIGNAL","WATCHING")]
-        if active:
-            lines = []
-            for s in active[:3]:
-                lines.append("{} {} | {} | Score: {}".format(
-                    s["symbol"], s.get("direction","?"),
-                    s["status"], s.get("score","?")))
-            send_telegram("TOP SETUPS:\n" + "\n".join(lines))
-        else:
-            send_telegram("No setups right now. Market may be in consolidation.")
-
-    elif text in ("/pnl", "pnl"):
-        trades    = db_get_today_trades()
-        closed    = [t for t in trades if t["outcome"] != "OPEN"]
-        total_pnl = sum(t["pnl"] or 0 for t in closed)
-        wins      = len([t for t in closed if t["outcome"] == "WIN"])
-        losses    = len([t for t in closed if t["outcome"] == "LOSS"])
-        send_telegram("TODAY P&L\nTrades: {} | W: {} L: {}\nTotal: ${}".format(
-            len(closed), wins, losses, round(total_pnl, 2)))
-
-    elif text in ("/help", "help"):
-        send_telegram(
-            "Commands:\n"
-            "/status - top current setups\n"
-            "/pnl - today P&L\n"
-            "/stop - pause bot\n"
-            "/start - resume bot\n"
-            "/help - this message"
-        )
+
+def cmd_status():
+    with state_lock:
+        sigs = list(all_signals)
+    active = [s for s in sigs if s.get("status") in ("SIGNAL","WATCHING")]
+    if active:
+        lines = []
+        for s in active[:3]:
+            lines.append("{} {} | {} | Score: {}".format(
+                s["symbol"], s.get("direction","?"),
+                s["status"], s.get("score","?")))
+        send_telegram("TOP SETUPS:\n" + "\n".join(lines))
+    else:
+        send_telegram("No setups right now. Market may be in consolidation.")
+
+
+def cmd_pnl():
+    total_pnl, wins, losses, n_closed = db_get_dashboard_snapshot()[2]
+    send_telegram("TODAY P&L\nTrades: {} | W: {} L: {}\nTotal: ${}".format(
+        n_closed, wins, losses, round(total_pnl, 2)))
+
+
+def cmd_help():
+    send_telegram(
+        "Commands:\n"
+        "/status - top current setups\n"
+        "/pnl - today P&L\n"
+        "/stop - pause bot\n"
+        "/start - resume bot\n"
+        "/help - this message"
+    )
+
+
+COMMANDS = {
+    "/stop":   cmd_stop,   "stop":   cmd_stop,
+    "/start":  cmd_start,  "start":  cmd_start,
+    "/status": cmd_status, "status": cmd_status,
+    "/pnl":    cmd_pnl,    "pnl":    cmd_pnl,
+    "/help":   cmd_help,   "help":   cmd_help,
+}
+
+
+def handle_telegram_command(text):
+    fn = COMMANDS.get(text.strip().lower())
+    if fn:
+        fn()
 
 
 # =============================================
 # MARKET OPEN
 # =============================================
 
+_clock_cache = {"until": 0, "is_open": None}   # valid until epoch "until"
+
 def market_open():
+    """
+    Outside the regular-hours window the answer is always closed, so no
+    request is made. Inside it the Alpaca clock is cached until its next
+    open/close transition (60s if that can't be read), since the state
+    only flips a couple of times a day.
+    """
+    now = datetime.now(ET)
+    if now.weekday() >= 5 or not (MARKET_OPEN <= now.time() <= MARKET_CLOSE):
+        return False
+    if _clock_cache["is_open"] is not None and time.time() < _clock_cache["until"]:
+        return _clock_cache["is_open"]
     try:
-        r = requests.get(CLOCK_URL, headers=HEADERS, timeout=5)
+        r = SESSION.get(CLOCK_URL, timeout=5)
         log("Clock HTTP {}".format(r.status_code))
         if r.status_code == 200:
-            clock = r.json()
+            clock   = fast_json.loads(r.content)
+            is_open = clock.get("is_open", False)
             log("Clock: {}".format(clock))
-            return clock.get("is_open", False)
+            try:
+                nxt   = clock["next_close"] if is_open else clock["next_open"]
+                until = datetime.fromisoformat(nxt).timestamp()
+            except Exception:
+                until = time.time() + 60
+            _clock_cache["until"]   = until
+            _clock_cache["is_open"] = is_open
+            return is_open
         log("Clock error: {}".format(r.text[:100]))
     except Exception as e:
         log("Clock exception: {}".format(e))
-    et    = pytz.timezone("America/New_York")
-    now   = datetime.now(et)
-    if now.weekday() >= 5:
-        return False
-    start = now.replace(hour=9,  minute=30, second=0, microsecond=0)
-    end   = now.replace(hour=16, minute=0,  second=0, microsecond=0)
-    return start <= now <= end
+    return True
 
 
 # =============================================
 # DATA FETCHING
 # =============================================
 
+# Shared by every scan; sized for the intraday + daily per-symbol
+# fallbacks at once
+SCAN_POOL = ThreadPoolExecutor(max_workers=2 * len(SYMBOLS),
+                               thread_name_prefix="scan")
+
+_intraday_cache = {}   # symbol -> (minute bucket, bars)
+_daily_cache    = {}   # symbol -> (fetch time, bars)
+
+DAILY_TTL = 900   # seconds; only today's bar moves, and it only feeds the vol ratio
+
+BAR_FIELDS = ("o", "h", "l", "c", "v")
+
+def parse_bars(raw):
+    """
+    Alpaca bar dicts -> columns: {"o"/"h"/"l"/"c"/"v": float64 array}.
+    Built once at fetch time; t / n / vw are never read and are dropped.
+    """
+    n = len(raw)
+    return {k: np.fromiter((b[k] for b in raw), dtype=np.float64, count=n)
+            for k in BAR_FIELDS}
+
+
+def bar_count(bars):
+    """Number of bars in a parse_bars() result; 0 for None."""
+    return len(bars["c"]) if bars else 0
+
+
 def get_intraday(symbol):
+    """
+    5-min bars for symbol, memoized per wall-clock minute so repeat
+    lookups within a scan (e.g. SPY for relative strength) skip the HTTP
+    round trip.
+    """
+    bucket = int(time.time() // 60)
+    cached = _intraday_cache.get(symbol)
+    if cached and cached[0] == bucket:
+        return cached[1]
     try:
-        r = requests.get(DATA_URL.format(symbol), headers=HEADERS,
-                         params={"timeframe": "5Min", "limit": 78}, timeout=10)
+        r = SESSION.get(BARS_URL.format(symbol),
+                        params={"timeframe": "5Min", "limit": 78}, timeout=10)
         if r.status_code != 200:
             log("Intraday {} error: {}".format(symbol, r.text[:80]))
             return None
-        bars = r.json().get("bars", [])
-        log("Intraday {}: {} bars".format(symbol, len(bars)))
+        bars = parse_bars(fast_json.loads(r.content).get("bars") or [])
+        log("Intraday {}: {} bars".format(symbol, bar_count(bars)))
+        _intraday_cache[symbol] = (bucket, bars)
         return bars
     except Exception as e:
         log("Intraday exception {}: {}".format(symbol, e))
@@ -404,69 +630,203 @@ def get_intraday(symbol):
 
 
 def get_daily(symbol):
+    """Daily bars for symbol, reused for DAILY_TTL seconds across scans."""
+    now    = time.time()
+    cached = _daily_cache.get(symbol)
+    if cached and now - cached[0] < DAILY_TTL:
+        return cached[1]
     try:
-        r = requests.get(DATA_URL.format(symbol), headers=HEADERS,
-                         params={"timeframe": "1Day", "limit": 20}, timeout=10)
+        r = SESSION.get(BARS_URL.format(symbol),
+                        params={"timeframe": "1Day", "limit": 20}, timeout=10)
         if r.status_code != 200:
             return None
-        return r.json().get("bars", [])
+        bars = parse_bars(fast_json.loads(r.content).get("bars") or [])
+        _daily_cache[symbol] = (now, bars)
+        return bars
     except:
         return None
 
 
+BULK_CHUNK = 100   # symbols per multi-symbol bars request
+
+def get_bars_bulk(symbols, timeframe, limit):
+    """
+    Bars for many symbols from Alpaca's multi-symbol endpoint: one request
+    (plus pagination) per BULK_CHUNK symbols.
+    The page limit there is shared across symbols, so pages are followed
+    and each series capped at `limit`, matching the per-symbol calls.
+    Returns {symbol: bars}, or None if any request fails.
+    """
+    out = {sym: [] for sym in symbols}
+    for i in range(0, len(symbols), BULK_CHUNK):
+        params = {
+            "symbols":   ",".join(symbols[i:i + BULK_CHUNK]),
+            "timeframe": timeframe,
+            "limit":     10000
+        }
+        while True:
+            r = SESSION.get(MULTI_BARS_URL, params=params, timeout=10)
+            if r.status_code != 200:
+                log("Bulk {} error: {}".format(timeframe, r.text[:80]))
+                return None
+            data = fast_json.loads(r.content)
+            for sym, bars in (data.get("bars") or {}).items():
+                out.setdefault(sym, []).extend(bars)
+            token = data.get("next_page_token")
+            if not token:
+                break
+            params["page_token"] = token
+    return {sym: parse_bars(bars[:limit]) for sym, bars in out.items()}
+
+
+def get_bars_all(symbols):
+    """
+    Intraday and daily bars for every symbol via two multi-symbol requests
+    issued together. Daily bars still fresh in _daily_cache are not
+    re-requested. Falls back to concurrent per-symbol fetches if a bulk
+    request fails.
+    Returns ({symbol: intraday or None}, {symbol: daily or None}).
+    """
+    now   = time.time()
+    daily = {sym: _daily_cache[sym][1] for sym in symbols
+             if sym in _daily_cache and now - _daily_cache[sym][0] < DAILY_TTL}
+    stale = [sym for sym in symbols if sym not in daily]
+
+    f_intraday = SCAN_POOL.submit(get_bars_bulk, symbols, "5Min", 78)
+    f_daily    = SCAN_POOL.submit(get_bars_bulk, stale, "1Day", 20) if stale else None
+    try:
+        intraday = f_intraday.result()
+    except Exception as e:
+        log("Bulk intraday exception: {}".format(e))
+        intraday = None
+    fetched = {}
+    if f_daily is not None:
+        try:
+            fetched = f_daily.result()
+        except Exception as e:
+            log("Bulk daily exception: {}".format(e))
+            fetched = None
+
+    if intraday is None:
+        intraday = dict(zip(symbols, SCAN_POOL.map(get_intraday, symbols)))
+    else:
+        # Seed the per-minute cache so get_spy_change() reuses these
+        bucket = int(time.time() // 60)
+        for sym, bars in intraday.items():
+            _intraday_cache[sym] = (bucket, bars)
+        log("Intraday: {} bars across {} symbols".format(
+            sum(bar_count(b) for b in intraday.values()), len(intraday)))
+    if fetched is None:
+        fetched = dict(zip(stale, SCAN_POOL.map(get_daily, stale)))
+    else:
+        for sym, bars in fetched.items():
+            _daily_cache[sym] = (now, bars)
+    daily.update(fetched)
+    return intraday, daily
+
+
+def quote_mid(q):
+    ap = q.get("ap", 0)
+    bp = q.get("bp", 0)
+    if ap and bp:
+        return round((ap + bp) / 2, 2)
+    return None
+
+
 def get_current_price(symbol):
     try:
-        r = requests.get(QUOTE_URL.format(symbol), headers=HEADERS, timeout=5)
+        r = SESSION.get(QUOTE_URL.format(symbol), timeout=5)
         if r.status_code == 200:
-            q  = r.json().get("quote", {})
-            ap = q.get("ap", 0)
-            bp = q.get("bp", 0)
-            if ap and bp:
-                return round((ap + bp) / 2, 2)
+            return quote_mid(fast_json.loads(r.content).get("quote", {}))
     except:
         pass
     return None
 
 
+def get_current_prices(symbols):
+    """
+    Mid price for every symbol from one multi-symbol latest-quotes request.
+    Returns None on any failure so callers can fall back to per-symbol.
+    """
+    try:
+        r = SESSION.get(MULTI_QUOTE_URL, params={"symbols": ",".join(symbols)},
+                        timeout=5)
+        if r.status_code != 200:
+            log("Bulk quote error {}".format(r.status_code))
+            return None
+        quotes = fast_json.loads(r.content).get("quotes") or {}
+        return {s: quote_mid(quotes.get(s) or {}) for s in symbols}
+    except Exception as e:
+        log("Bulk quote exception: {}".format(e))
+        return None
+
+
 # =============================================
 # INDICATORS
 # =============================================
 
-def calculate_vwap(bars):
-    pv = vol = 0
-    for b in bars:
-        typ  = (b["h"] + b["l"] + b["c"]) / 3
-        pv  += typ * b["v"]
-        vol += b["v"]
-    return pv / vol if vol else None
-
-
-def volatility_score(daily_bars):
+def intraday_levels(intraday_by_symbol):
     """
-    Returns a multiplier (0.5 to 1.5) based on today's range vs average.
+    ORB high/low, last close and session VWAP for every symbol with enough
+    bars, from one column extraction over all symbols' concatenated
+    intraday columns; per-symbol sums come from reduceat over the segments.
+    Returns {symbol: (orb_high, orb_low, price, vwap)}; vwap is None on
+    zero volume.
+    """
+    syms = [sym for sym, bars in intraday_by_symbol.items()
+            if bar_count(bars) >= ORB_BARS + 2]
+    if not syms:
+        return {}
+    series = [intraday_by_symbol[sym] for sym in syms]
+    lens   = np.fromiter(map(bar_count, series), dtype=np.intp, count=len(series))
+
+    highs, lows, close, vols = (np.concatenate([bars[k] for bars in series])
+                                for k in "hlcv")
+    ends   = np.cumsum(lens)
+    starts = ends - lens
+    orb    = starts[:, None] + np.arange(ORB_BARS)   # first ORB_BARS of each
+
+    vol  = np.add.reduceat(vols, starts)
+    pv   = np.add.reduceat((highs + lows + close) * (1.0 / 3.0) * vols, starts)
+    vwap = np.divide(pv, vol, out=np.zeros_like(pv), where=vol != 0)
+    return {sym: (oh, ol, p, vw if v else None) for sym, oh, ol, p, vw, v in zip(
+        syms, highs[orb].max(axis=1).tolist(), lows[orb].min(axis=1).tolist(),
+        close[ends - 1].tolist(), vwap.tolist(), vol.tolist())}
+
+
+def volatility_scores(daily_by_symbol):
+    """
+    Volatility multiplier (0.5 to 1.5) from today's range vs average, for
+    every symbol in one vectorized pass over the concatenated daily ranges.
     No longer a hard block - just modifies signal score.
     Only returns 0 on truly dead days (< 30% of average range).
+    Returns {symbol: (vol_mult, daily high-low ranges array)}.
     """
-    if len(daily_bars) < 5:
-        return 1.0
-    ranges    = [b["h"] - b["l"] for b in daily_bars]
-    today_rng = ranges[-1]
-    avg_rng   = statistics.mean(ranges[:-1])
-    if avg_rng == 0:
-        return 1.0
-    ratio = today_rng / avg_rng
-    log("  Vol ratio: {:.2f} (today={:.2f} avg={:.2f})".format(
-        ratio, today_rng, avg_rng))
-    if ratio < 0.30:
-        return 0.0    # truly dead day - skip
-    elif ratio < 0.60:
-        return 0.6    # below avg - reduce score
-    elif ratio < 0.85:
-        return 0.85   # slightly below avg - small reduction
-    elif ratio <= 1.20:
-        return 1.0    # normal
-    else:
-        return 1.3    # high vol day - bonus
+    syms = [sym for sym, bars in daily_by_symbol.items() if bar_count(bars)]
+    if not syms:
+        return {}
+    lens = np.fromiter((bar_count(daily_by_symbol[sym]) for sym in syms),
+                       dtype=np.intp, count=len(syms))
+    flat = np.concatenate([daily_by_symbol[sym]["h"] - daily_by_symbol[sym]["l"]
+                           for sym in syms])
+    ends  = np.cumsum(lens)
+    today = flat[ends - 1]
+    avg   = (np.add.reduceat(flat, ends - lens) - today) / np.maximum(lens - 1, 1)
+    ratio = np.divide(today, avg, out=np.zeros_like(today), where=avg != 0)
+
+    mult = np.select(
+        [ratio < 0.30, ratio < 0.60, ratio < 0.85, ratio <= 1.20],
+        [0.0,          0.6,          0.85,         1.0],
+        1.3)   # dead day - skip / below avg / slightly below / normal / high vol
+    neutral       = (lens < 5) | (avg == 0)
+    mult[neutral] = 1.0
+
+    for sym, r, t, a, skip in zip(syms, ratio.tolist(), today.tolist(),
+                                  avg.tolist(), neutral.tolist()):
+        if not skip:
+            log("  {} vol ratio: {:.2f} (today={:.2f} avg={:.2f})".format(
+                sym, r, t, a))
+    return dict(zip(syms, zip(mult.tolist(), np.split(flat, ends[:-1]))))
 
 
 # =============================================
@@ -479,10 +839,10 @@ def get_premarket_gap(daily_bars, intraday_bars):
     Uses first intraday bar open vs last daily bar close.
     Returns (gap_pct, gap_direction) e.g. (1.23, "UP") or (-0.85, "DOWN")
     """
-    if not daily_bars or not intraday_bars:
+    if not bar_count(daily_bars) or not bar_count(intraday_bars):
         return 0.0, "FLAT"
-    prev_close  = daily_bars[-1]["c"]
-    today_open  = intraday_bars[0]["o"]
+    prev_close  = float(daily_bars["c"][-1])
+    today_open  = float(intraday_bars["o"][0])
     if prev_close == 0:
         return 0.0, "FLAT"
     gap_pct = round((today_open - prev_close) / prev_close * 100, 3)
@@ -499,35 +859,21 @@ def get_premarket_gap(daily_bars, intraday_bars):
 # SPY RELATIVE STRENGTH
 # =============================================
 
-_spy_cache = {"bars": None, "ts": 0}
-
 def get_spy_change():
     """
     Returns SPY intraday % change from open.
-    Cached for 60s to avoid repeated API calls during full scan.
+    Served from the per-minute intraday cache, so a full scan reuses the
+    SPY bars it already fetched.
     """
-    global _spy_cache
-    now = time.time()
-    if _spy_cache["bars"] and now - _spy_cache["ts"] < 60:
-        bars = _spy_cache["bars"]
-    else:
-        bars = get_intraday("SPY")
-        _spy_cache = {"bars": bars, "ts": now}
-    if not bars or len(bars) < 2:
-        return 0.0
-    open_price = bars[0]["o"]
-    last_price = bars[-1]["c"]
-    if open_price == 0:
-        return 0.0
-    return round((last_price - open_price) / open_price * 100, 3)
+    return get_symbol_change(get_intraday("SPY"))
 
 
 def get_symbol_change(intraday_bars):
     """Intraday % change from open for a symbol."""
-    if not intraday_bars or len(intraday_bars) < 2:
+    if bar_count(intraday_bars) < 2:
         return 0.0
-    open_price = intraday_bars[0]["o"]
-    last_price = intraday_bars[-1]["c"]
+    open_price = float(intraday_bars["o"][0])
+    last_price = float(intraday_bars["c"][-1])
     if open_price == 0:
         return 0.0
     return round((last_price - open_price) / open_price * 100, 3)
@@ -662,6 +1008,97 @@ def confluence_grade(breakout_strength, vol_ratio, vol_mult,
 # OPTIONS
 # =============================================
 
+def prune_cache(cache, is_stale):
+    """
+    Drop entries where is_stale(key, value). Iterates over a snapshot of
+    the items, so scan-pool threads may insert concurrently.
+    """
+    for k, v in list(cache.items()):
+        if is_stale(k, v):
+            cache.pop(k, None)
+
+
+_exp_cache = {}   # (symbol, ET date) -> expiration dates
+
+def get_expirations(symbol, today_str):
+    """
+    Option expiration dates for symbol. The list only changes from one
+    trading day to the next, so it is fetched once per symbol per day.
+    Returns a list, or None on HTTP error.
+    """
+    key = (symbol, today_str)
+    if key in _exp_cache:
+        return _exp_cache[key]
+    exp_url = "{}/markets/options/expirations".format(TRADIER_URL)
+    r = TRADIER_SESSION.get(exp_url,
+                            params={"symbol": symbol, "includeAllRoots": "true"},
+                            timeout=10)
+    log("Tradier expirations {}: HTTP {}".format(symbol, r.status_code))
+    if r.status_code != 200:
+        log("  Expirations error: {}".format(r.text[:150]))
+        return None
+
+    expirations = fast_json.loads(r.content).get("expirations", {}) or {}
+    exp_dates   = expirations.get("date", [])
+    if isinstance(exp_dates, str):
+        exp_dates = [exp_dates]
+    # A new day's first fetch drops the previous days' entries
+    prune_cache(_exp_cache, lambda k, v: k[1] != today_str)
+    _exp_cache[key] = exp_dates
+    return exp_dates
+
+
+def parse_chain(chain):
+    """
+    Column view of the fields the ATM filter screens on:
+    {"type": lowercased option_type, "strike": float64}. Built once per
+    cached chain and shared by both directions.
+    """
+    n = len(chain)
+    return {
+        "type":   np.array([(o.get("option_type", "")).lower() for o in chain], dtype=str),
+        "strike": np.fromiter((float(o.get("strike", 0)) for o in chain),
+                              dtype=np.float64, count=n),
+    }
+
+
+_chain_cache = {}   # (symbol, expiration) -> (minute bucket, (contracts, columns))
+
+def get_option_chain(symbol, expiration):
+    """
+    Option chain (calls and puts, with greeks) for one expiration,
+    memoized per wall-clock minute so both directions and repeat lookups
+    inside the minute share one Tradier request.
+    Returns (contracts, parse_chain columns), or None on HTTP error.
+    """
+    key    = (symbol, expiration)
+    bucket = int(time.time() // 60)
+    cached = _chain_cache.get(key)
+    if cached and cached[0] == bucket:
+        return cached[1]
+    chain_url = "{}/markets/options/chains".format(TRADIER_URL)
+    r = TRADIER_SESSION.get(chain_url,
+                            params={"symbol":     symbol,
+                                    "expiration": expiration,
+                                    "greeks":     "true"},
+                            timeout=10)
+    log("Tradier chain {} {}: HTTP {}".format(symbol, expiration, r.status_code))
+    if r.status_code != 200:
+        log("  Chain error: {}".format(r.text[:150]))
+        return None
+
+    options = fast_json.loads(r.content).get("options", {}) or {}
+    chain   = options.get("option", [])
+    if isinstance(chain, dict):
+        chain = [chain]
+    log("  Chain returned {} contracts".format(len(chain)))
+    parsed = (chain, parse_chain(chain))
+    # Older minutes (and past expirations) can never be hit again
+    prune_cache(_chain_cache, lambda k, v: v[0] != bucket)
+    _chain_cache[key] = (bucket, parsed)
+    return parsed
+
+
 def get_liquid_option(symbol, direction, underlying_price=None):
     """
     Fetch a real 0DTE ATM option via Tradier API.
@@ -673,8 +1110,7 @@ def get_liquid_option(symbol, direction, underlying_price=None):
     Returns (premium, strike, is_live)
     """
     option_type = "call" if direction == "CALL" else "put"
-    et          = pytz.timezone("America/New_York")
-    today_str   = datetime.now(et).strftime("%Y-%m-%d")
+    today_str   = et_today()
 
     if not TRADIER_TOKEN:
         log("TRADIER_TOKEN not set - cannot fetch options")
@@ -682,20 +1118,10 @@ def get_liquid_option(symbol, direction, underlying_price=None):
 
     try:
         # Step 1: Get available expirations and confirm today is 0DTE
-        exp_url = "{}/markets/options/expirations".format(TRADIER_URL)
-        r = requests.get(exp_url, headers=TRADIER_HEADERS,
-                         params={"symbol": symbol, "includeAllRoots": "true"},
-                         timeout=10)
-        log("Tradier expirations {}: HTTP {}".format(symbol, r.status_code))
-        if r.status_code != 200:
-            log("  Expirations error: {}".format(r.text[:150]))
+        exp_dates = get_expirations(symbol, today_str)
+        if exp_dates is None:
             return None, None, False
 
-        expirations = r.json().get("expirations", {}) or {}
-        exp_dates   = expirations.get("date", [])
-        if isinstance(exp_dates, str):
-            exp_dates = [exp_dates]
-
         # Use today if available, else nearest expiration
         if today_str in exp_dates:
             target_exp = today_str
@@ -708,39 +1134,23 @@ def get_liquid_option(symbol, direction, underlying_price=None):
             return None, None, False
 
         # Step 2: Fetch options chain for target expiration
-        chain_url = "{}/markets/options/chains".format(TRADIER_URL)
-        r2 = requests.get(chain_url, headers=TRADIER_HEADERS,
-                          params={"symbol":     symbol,
-                                  "expiration": target_exp,
-                                  "greeks":     "true"},
-                          timeout=10)
-        log("Tradier chain {} {}: HTTP {}".format(symbol, target_exp, r2.status_code))
-        if r2.status_code != 200:
-            log("  Chain error: {}".format(r2.text[:150]))
+        fetched = get_option_chain(symbol, target_exp)
+        if fetched is None:
             return None, None, False
+        chain, cols = fetched
 
-        options = r2.json().get("options", {}) or {}
-        chain   = options.get("option", [])
-        if isinstance(chain, dict):
-            chain = [chain]
-
-        log("  Chain returned {} contracts".format(len(chain)))
+        # Step 3: Filter to correct type and ATM strikes - screened on the
+        # cached columns, so only the few near-the-money rows are walked
+        strikes = cols["strike"]
+        keep    = (cols["type"] == option_type) & (strikes != 0)
+        if underlying_price:
+            # Strike within 2% of underlying
+            keep &= ~(np.abs(strikes - underlying_price) / underlying_price > 0.02)
 
-        # Step 3: Filter to correct type and ATM strikes
         candidates = []
-        for opt in chain:
-            if opt.get("option_type", "").lower() != option_type[0]:
-                continue  # wrong type
-
-            strike = float(opt.get("strike", 0))
-            if strike == 0:
-                continue
-
-            # Strike within 2% of underlying
-            if underlying_price:
-                pct_diff = abs(strike - underlying_price) / underlying_price
-                if pct_diff > 0.02:
-                    continue
+        for i in np.flatnonzero(keep).tolist():
+            opt    = chain[i]
+            strike = float(strikes[i])
 
             # Get mid price from bid/ask
             bid = float(opt.get("bid") or 0)
@@ -780,9 +1190,8 @@ def get_liquid_option(symbol, direction, underlying_price=None):
             log("  No ATM candidates found - check strike range")
             return None, None, False
 
-        # Step 4: Sort by closest delta to 0.40 (ATM sweet spot for 0DTE)
-        candidates.sort(key=lambda x: abs(x["delta"] - 0.40))
-        best = candidates[0]
+        # Step 4: Pick closest delta to 0.40 (ATM sweet spot for 0DTE)
+        best = min(candidates, key=lambda x: abs(x["delta"] - 0.40))
         log("  Selected: strike={} delta={:.3f} bid={} ask={} mid={} vol={} oi={}".format(
             best["strike"], best["delta"], best["bid"], best["ask"],
             best["price"], best["volume"], best["oi"]))
@@ -811,190 +1220,229 @@ def calculate_contracts(premium, score=80):
 # SCANNER
 # =============================================
 
-def scan_all_symbols():
-    results = []
-
-    for symbol in SYMBOLS:
-        result = {
-            "symbol":    symbol,
-            "direction": None,
-            "score":     0,
-            "grade":     None,
-            "grade_pts": 0,
-            "grade_color": "#8b949e",
-            "price":     None,
-            "premium":   None,
-            "strike":    None,
-            "contracts": None,
-            "stop":      None,
-            "target":    None,
-            "status":    "scanning",
-            "vwap":      None,
-            "orb_high":  None,
-            "orb_low":   None,
-            "vs_orb":    None,
-            "vs_vwap":   None,
-            "vol_ratio": None,
-            "gap_pct":   None,
-            "gap_dir":   None,
-            "rs":        None,
-            "spy_chg":   None,
-            "late_entry": False,
-        }
-
-        intraday = get_intraday(symbol)
-        daily    = get_daily(symbol)
-
-        if not intraday or len(intraday) < ORB_BARS + 2 or not daily:
-            result["status"] = "no data"
-            results.append(result)
-            continue
-
-        # Volatility score (modifier, not hard block)
-        vol_mult = volatility_score(daily)
-        if vol_mult == 0.0:
-            result["status"] = "dead market"
-            results.append(result)
-            continue
-
-        # ORB using first 30 min (6 bars)
-        orb      = intraday[:ORB_BARS]
-        orb_high = max(b["h"] for b in orb)
-        orb_low  = min(b["l"] for b in orb)
-        current  = intraday[-1]
-        price    = current["c"]
-        vwap     = calculate_vwap(intraday)
-
-        if not vwap:
-            result["status"] = "no vwap"
-            results.append(result)
-            continue
+def classify_breakouts(levels):
+    """
+    Breakout direction and strength for every symbol in one vectorized
+    pass.
+    levels: {symbol: (orb_high, orb_low, price, vwap)}; symbols without a
+    VWAP are skipped. Returns {symbol: (direction or None, strength)}.
+    """
+    syms = [sym for sym, lv in levels.items() if lv[3]]
+    if not syms:
+        return {}
+    orb_high, orb_low, price, vwap = np.array(
+        [levels[sym] for sym in syms], dtype=np.float64).T
+
+    call     = (price > orb_high) & (price > vwap)
+    put      = ~call & (price < orb_low) & (price < vwap)
+    strength = np.where(call, (price - orb_high) / orb_high,
+                        np.where(put, (orb_low - price) / orb_low, 0.0))
+    direction = np.where(call, "CALL", np.where(put, "PUT", ""))
+    return {sym: (d or None, x) for sym, d, x in
+            zip(syms, direction.tolist(), strength.tolist())}
+
+
+def _scan_symbol(symbol, intraday, daily, levels, breakout, vol,
+                 et_hour, spy_chg):
+    """
+    Score one symbol from its prefetched bars, ORB/VWAP levels, breakout
+    classification and vol = (vol_mult, daily ranges) from
+    volatility_scores. et_hour (ET time of day as a float hour) and
+    spy_chg (SPY % change) are shared by the whole scan.
+    Returns (dashboard result dict, (price, score) on a breakout else None).
+    """
+    result = {
+        "symbol":    symbol,
+        "direction": None,
+        "score":     0,
+        "grade":     None,
+        "grade_pts": 0,
+        "grade_color": "#8b949e",
+        "price":     None,
+        "premium":   None,
+        "strike":    None,
+        "contracts": None,
+        "stop":      None,
+        "target":    None,
+        "status":    "scanning",
+        "vwap":      None,
+        "orb_high":  None,
+        "orb_low":   None,
+        "vs_orb":    None,
+        "vs_vwap":   None,
+        "vol_ratio": None,
+        "gap_pct":   None,
+        "gap_dir":   None,
+        "rs":        None,
+        "spy_chg":   None,
+        "late_entry": False,
+    }
 
-        range_size = orb_high - orb_low
-        vs_orb_high = round((price - orb_high) / orb_high * 100, 3)
-        vs_orb_low  = round((orb_low - price) / orb_low * 100, 3)
-        vs_vwap     = round((price - vwap) / vwap * 100, 3)
-
-        orb_range = orb_high - orb_low
-
-        # Gap analysis
-        gap_pct, gap_dir = get_premarket_gap(daily, intraday)
-
-        # Relative strength vs SPY
-        spy_chg    = get_spy_change()
-        sym_chg    = get_symbol_change(intraday)
-        rs         = relative_strength(sym_chg, spy_chg)
-
-        # Time of day
-        et         = pytz.timezone("America/New_York")
-        et_now     = datetime.now(et)
-        et_hour    = et_now.hour + et_now.minute / 60.0
-        late_entry = et_hour >= 14.0
-
-        result["price"]          = round(price, 2)
-        result["vwap"]           = round(vwap, 2)
-        result["orb_high"]       = round(orb_high, 2)
-        result["orb_low"]        = round(orb_low, 2)
-        result["vol_mult"]       = round(vol_mult, 2)
-        result["gap_pct"]        = gap_pct
-        result["gap_dir"]        = gap_dir
-        result["rs"]             = rs
-        result["spy_chg"]        = spy_chg
-        result["late_entry"]     = late_entry
-        # Underlying price targets
-        # CALL: targets above current price, stop below ORB high
-        # PUT:  targets below current price, stop above ORB low
-        # T1 = 1x ORB range from current price
-        # T2 = 2x ORB range from current price
-        # Stop = 0.5x ORB range against trade direction
-        if orb_range > 0:
-            result["und_call_t1"]   = round(price + orb_range, 2)
-            result["und_call_t2"]   = round(price + orb_range * 2, 2)
-            result["und_call_stop"] = round(price - orb_range * 0.5, 2)
-            result["und_put_t1"]    = round(price - orb_range, 2)
-            result["und_put_t2"]    = round(price - orb_range * 2, 2)
-            result["und_put_stop"]  = round(price + orb_range * 0.5, 2)
-            # Probability estimates based on distance vs average daily range
-            avg_range = statistics.mean([b["h"] - b["l"] for b in daily[-10:]])
-            if avg_range > 0:
-                result["t1_prob"] = round(max(20, min(85,
-                    100 - (orb_range / avg_range * 100))), 0)
-                result["t2_prob"] = round(max(10, min(60,
-                    100 - (orb_range * 2 / avg_range * 100))), 0)
-            else:
-                result["t1_prob"] = 50
-                result["t2_prob"] = 25
+    if bar_count(intraday) < ORB_BARS + 2 or not bar_count(daily):
+        result["status"] = "no data"
+        return result, None
+
+    # Volatility score (modifier, not hard block)
+    vol_mult, daily_ranges = vol
+    if vol_mult == 0.0:
+        result["status"] = "dead market"
+        return result, None
+
+    # ORB using first 30 min (6 bars), last price and VWAP
+    orb_high, orb_low, price, vwap = levels
+
+    if not vwap:
+        result["status"] = "no vwap"
+        return result, None
+
+    vs_orb_high = round((price - orb_high) / orb_high * 100, 3)
+    vs_orb_low  = round((orb_low - price) / orb_low * 100, 3)
+    vs_vwap     = round((price - vwap) / vwap * 100, 3)
+
+    orb_range = orb_high - orb_low
+
+    # Gap analysis
+    gap_pct, gap_dir = get_premarket_gap(daily, intraday)
+
+    # Relative strength vs SPY
+    sym_chg    = get_symbol_change(intraday)
+    rs         = relative_strength(sym_chg, spy_chg)
+
+    # Time of day (read once per scan by the caller)
+    late_entry = et_hour >= 14.0
+
+    result["price"]          = round(price, 2)
+    result["vwap"]           = round(vwap, 2)
+    result["orb_high"]       = round(orb_high, 2)
+    result["orb_low"]        = round(orb_low, 2)
+    result["vol_mult"]       = round(vol_mult, 2)
+    result["gap_pct"]        = gap_pct
+    result["gap_dir"]        = gap_dir
+    result["rs"]             = rs
+    result["spy_chg"]        = spy_chg
+    result["late_entry"]     = late_entry
+    # Underlying price targets
+    # CALL: targets above current price, stop below ORB high
+    # PUT:  targets below current price, stop above ORB low
+    # T1 = 1x ORB range from current price
+    # T2 = 2x ORB range from current price
+    # Stop = 0.5x ORB range against trade direction
+    if orb_range > 0:
+        result["und_call_t1"]   = round(price + orb_range, 2)
+        result["und_call_t2"]   = round(price + orb_range * 2, 2)
+        result["und_call_stop"] = round(price - orb_range * 0.5, 2)
+        result["und_put_t1"]    = round(price - orb_range, 2)
+        result["und_put_t2"]    = round(price - orb_range * 2, 2)
+        result["und_put_stop"]  = round(price + orb_range * 0.5, 2)
+        # Probability estimates based on distance vs average daily range
+        avg_range = float(daily_ranges[-10:].mean())
+        if avg_range > 0:
+            result["t1_prob"] = round(max(20, min(85,
+                100 - (orb_range / avg_range * 100))), 0)
+            result["t2_prob"] = round(max(10, min(60,
+                100 - (orb_range * 2 / avg_range * 100))), 0)
+        else:
+            result["t1_prob"] = 50
+            result["t2_prob"] = 25
 
-        # Determine direction and breakout strength
-        direction         = None
-        breakout_strength = 0
+    # Direction and breakout strength (classified for all symbols at once)
+    direction, breakout_strength = breakout
 
-        if price > orb_high and price > vwap:
-            direction         = "CALL"
-            breakout_strength = (price - orb_high) / orb_high
-            result["vs_orb"]  = "+{}%".format(abs(vs_orb_high))
-            result["vs_vwap"] = "+{}%".format(abs(vs_vwap))
+    if direction == "CALL":
+        result["vs_orb"]  = "+{}%".format(abs(vs_orb_high))
+        result["vs_vwap"] = "+{}%".format(abs(vs_vwap))
 
-        elif price < orb_low and price < vwap:
-            direction         = "PUT"
-            breakout_strength = (orb_low - price) / orb_low
-            result["vs_orb"]  = "-{}%".format(abs(vs_orb_low))
-            result["vs_vwap"] = "-{}%".format(abs(vs_vwap))
+    elif direction == "PUT":
+        result["vs_orb"]  = "-{}%".format(abs(vs_orb_low))
+        result["vs_vwap"] = "-{}%".format(abs(vs_vwap))
 
+    else:
+        # No confirmed breakout yet - classify as WATCHING
+        # Show best directional bias based on price location
+        if price > vwap:
+            result["direction"] = "CALL"
+            result["vs_vwap"]   = "+{}%".format(abs(vs_vwap))
+            result["vs_orb"]    = "{:.2f}% from ORB high".format(
+                abs(vs_orb_high))
         else:
-            # No confirmed breakout yet - classify as WATCHING
-            # Show best directional bias based on price location
-            if price > vwap:
-                result["direction"] = "CALL"
-                result["vs_vwap"]   = "+{}%".format(abs(vs_vwap))
-                result["vs_orb"]    = "{:.2f}% from ORB high".format(
-                    abs(vs_orb_high))
-            else:
-                result["direction"] = "PUT"
-                result["vs_vwap"]   = "-{}%".format(abs(vs_vwap))
-                result["vs_orb"]    = "{:.2f}% from ORB low".format(
-                    abs(vs_orb_low))
-
-            # Score based on proximity to breakout level
-            proximity = 1 - min(abs(vs_orb_high), abs(vs_orb_low)) / 100
-            vol_ratio = current["v"] / intraday[-2]["v"] if intraday[-2]["v"] > 0 else 1
-            result["score"]  = round(proximity * vol_mult * 10, 2)
-            result["status"] = "WATCHING"
-            results.append(result)
-            continue
+            result["direction"] = "PUT"
+            result["vs_vwap"]   = "-{}%".format(abs(vs_vwap))
+            result["vs_orb"]    = "{:.2f}% from ORB low".format(
+                abs(vs_orb_low))
+
+        # Score based on proximity to breakout level
+        proximity = 1 - min(abs(vs_orb_high), abs(vs_orb_low)) / 100
+        result["score"]  = round(proximity * vol_mult * 10, 2)
+        result["status"] = "WATCHING"
+        return result, None
+
+    # Confirmed breakout - options are priced later (see price_signal)
+    vols      = intraday["v"]
+    vol_ratio = float(vols[-1] / vols[-2]) if vols[-2] > 0 else 1
+    score     = (breakout_strength * 100 + vol_ratio) * vol_mult
+
+    # Confluence grade
+    grade, grade_pts, grade_color = confluence_grade(
+        breakout_strength, vol_ratio, vol_mult,
+        gap_pct, gap_dir, rs, direction, et_hour)
+
+    result["is_live"]     = False
+    result["status"]      = "SIGNAL (no options)"
+    result["direction"]   = direction
+    result["score"]       = round(score, 2)
+    result["grade"]       = grade
+    result["grade_pts"]   = grade_pts
+    result["grade_color"] = grade_color
+    return result, (price, score)
+
+
+def price_signal(result, price, score):
+    """Attach a live option quote and sizing to a breakout result."""
+    premium, strike, is_live = get_liquid_option(
+        result["symbol"], result["direction"], price)
+    if premium and is_live:
+        contracts, stop, target = calculate_contracts(premium, score)
+        result["premium"]   = round(premium, 2)
+        result["strike"]    = strike
+        result["contracts"] = contracts
+        result["stop"]      = stop
+        result["target"]    = target
+        result["is_live"]   = True
+        result["status"]    = "SIGNAL"
 
-        # Confirmed breakout - get options
-        vol_ratio = current["v"] / intraday[-2]["v"] if intraday[-2]["v"] > 0 else 1
-        score     = (breakout_strength * 100 + vol_ratio) * vol_mult
-
-        # Confluence grade
-        grade, grade_pts, grade_color = confluence_grade(
-            breakout_strength, vol_ratio, vol_mult,
-            gap_pct, gap_dir, rs, direction, et_hour)
-
-        premium, strike, is_live = get_liquid_option(symbol, direction, price)
-
-        if premium and is_live:
-            contracts, stop, target = calculate_contracts(premium, score)
-            result["premium"]   = round(premium, 2)
-            result["strike"]    = strike
-            result["contracts"] = contracts
-            result["stop"]      = stop
-            result["target"]    = target
-            result["is_live"]   = True
-            result["status"]    = "SIGNAL"
-        else:
-            result["is_live"]   = False
-            result["status"]    = "SIGNAL (no options)"
-
-        result["direction"]   = direction
-        result["score"]       = round(score, 2)
-        result["grade"]       = grade
-        result["grade_pts"]   = grade_pts
-        result["grade_color"] = grade_color
-        results.append(result)
+
+def scan_all_symbols():
+    """
+    Scan every symbol concurrently. Bars for all symbols are fetched in a
+    single wave first and every symbol is scored from them; only the
+    OPTION_CANDIDATES highest-scoring breakouts are then priced against
+    the Tradier chain, the rest stay "SIGNAL (no options)".
+    """
+    intraday_by_symbol, daily_by_symbol = get_bars_all(SYMBOLS)
+    levels    = intraday_levels(intraday_by_symbol)
+    breakouts = classify_breakouts(levels)
+    vols      = volatility_scores(daily_by_symbol)
+    et_now    = datetime.now(ET)
+    et_hour   = et_now.hour + et_now.minute / 60.0
+    spy_chg   = get_spy_change()
+
+    scanned = list(SCAN_POOL.map(
+        lambda sym: _scan_symbol(sym, intraday_by_symbol.get(sym),
+                                 daily_by_symbol.get(sym),
+                                 levels.get(sym),
+                                 breakouts.get(sym, (None, 0)),
+                                 vols.get(sym), et_hour, spy_chg),
+        SYMBOLS))
+    hits = sorted(((r, p) for r, p in scanned if p),
+                  key=lambda rp: -rp[1][1])
+    list(SCAN_POOL.map(lambda rp: price_signal(rp[0], *rp[1]),
+                       hits[:OPTION_CANDIDATES]))
+
+    for r, (_, score) in hits:
         log("{}: {} {} grade={} ({}) score={:.2f}".format(
-            symbol, result["status"], direction, grade, grade_pts, score))
+            r["symbol"], r["status"], r["direction"], r["grade"],
+            r["grade_pts"], score))
+    results = [r for r, _ in scanned]
 
     # Sort: SIGNAL first, then WATCHING, then rest - all by score desc
     def sort_key(r):
@@ -1016,31 +1464,49 @@ def scan_all_symbols():
 # MAIN SCAN RUNNER
 # =============================================
 
+def get_open_trade_prices():
+    """Current price for each symbol with an open trade, in one request."""
+    symbols = sorted({t["symbol"] for t in db_get_open_trades()})
+    if not symbols:
+        return {}
+    prices = get_current_prices(symbols)
+    if prices is not None:
+        return prices
+    return dict(zip(symbols, SCAN_POOL.map(get_current_price, symbols)))
+
+
 def run_signal_scan():
-    global all_signals, next_scan_at
+    global all_signals, next_scan_at, market_is_open, open_prices
     log("=== Running signal scan ===")
     log("Key set: {} | Secret set: {} | Bot: {}".format(
         bool(ALPACA_KEY), bool(ALPACA_SECRET), bot_enabled))
 
-    if not market_open():
+    is_open = market_open()
+    with state_lock:
+        market_is_open = is_open
+
+    if not is_open:
         log("Market closed - skipping scan")
         with state_lock:
             next_scan_at = time.time() + SCAN_INTERVAL
         return
 
     results = scan_all_symbols()
+    prices  = get_open_trade_prices()
 
     with state_lock:
         all_signals  = results
+        open_prices  = prices
         next_scan_at = time.time() + SCAN_INTERVAL
 
     signals  = [r for r in results if r["status"] == "SIGNAL"]
     watching = [r for r in results if r["status"] == "WATCHING"]
 
     # Telegram: alert on confirmed signals
+    today = et_today()
     for sig in signals:
-        if bot_enabled and should_alert(sig["symbol"], sig["direction"]):
-            db_log_signal(sig)
+        if bot_enabled and should_alert(sig["symbol"], sig["direction"], today):
+            db_log_signal(sig, load_last_alert())
             msg = (
                 "INSTITUTIONAL BREAKOUT\n\n"
                 "Symbol: {}\nDirection: {}\nScore: {}\n\n"
@@ -1058,8 +1524,7 @@ def run_signal_scan():
 
     # Telegram: send watching list if no signals
     if not signals and watching and bot_enabled:
-        et    = pytz.timezone("America/New_York")
-        now   = datetime.now(et)
+        now   = datetime.now(ET)
         # Only send watching alert once, between 10:00-10:05 AM
         if now.hour == 10 and now.minute < 6:
             top3  = watching[:3]
@@ -1095,11 +1560,47 @@ def background_scheduler():
         time.sleep(SCAN_INTERVAL)
 
 
+def telegram_sender():
+    # Drains the send queue; identical messages repeated within a minute
+    # are collapsed, bursts (e.g. several alerts from one scan) are joined
+    # into one post, failed posts are retried with backoff
+    last_msg, last_at = None, 0
+    carry = None   # message that did not fit in the previous batch
+    while True:
+        msg = carry if carry is not None else _tg_queue.get()
+        carry, batch, size = None, [], 0
+        while True:
+            if not (msg == last_msg and time.time() - last_at < 60):
+                if batch and size + len(TG_BATCH_SEP) + len(msg) > TG_MAX_LEN:
+                    carry = msg
+                    break
+                size += len(msg) + (len(TG_BATCH_SEP) if batch else 0)
+                batch.append(msg)
+                last_msg, last_at = msg, time.time()
+            try:
+                msg = _tg_queue.get(timeout=TG_BATCH_WINDOW)
+            except queue.Empty:
+                break
+        if not batch:
+            continue
+        text = TG_BATCH_SEP.join(batch)
+        for attempt in range(3):
+            if post_telegram(text):
+                break
+            time.sleep(2 ** attempt)
+
+
 def telegram_poller():
+    # getUpdates long-polls: Telegram holds the request open until a
+    # message arrives. Back off only after an empty round (error/timeout)
+    if not TELEGRAM_TOKEN:
+        log("Telegram poller disabled: no token")
+        return
     log("Telegram poller started")
     offset = 0
     time.sleep(15)
     while True:
+        updates = []
         try:
             updates, offset = get_telegram_updates(offset)
             for update in updates:
@@ -1110,307 +1611,58 @@ def telegram_poller():
                     handle_telegram_command(text)
         except Exception as e:
             log("Telegram poller error: {}".format(e))
-        time.sleep(3)
+        if not updates:
+            time.sleep(3)
 
 
 # =============================================
 # DASHBOARD
 # =============================================
 
-def render_dashboard():
-    with state_lock:
-        signals = list(all_signals)
-        secs    = max(0, int(next_scan_at - time.time()))
-        logs    = list(debug_log[-30:])
-
-    trades      = db_get_today_trades()
-    open_trades = db_get_open_trades()
-    closed      = [t for t in trades if t["outcome"] != "OPEN"]
-    total_pnl   = sum(t["pnl"] or 0 for t in closed)
-    wins        = len([t for t in closed if t["outcome"] == "WIN"])
-    losses      = len([t for t in closed if t["outcome"] == "LOSS"])
-    win_rate    = round(wins / len(closed) * 100) if closed else 0
-
-    is_open       = market_open()
-    market_color  = "#3fb950" if is_open else "#f85149"
-    market_status = "OPEN" if is_open else "CLOSED"
-    pnl_color     = "#3fb950" if total_pnl >= 0 else "#f85149"
-
-    # - Signal rows -
-    signal_rows = ""
-    active_count = len([s for s in signals if s.get("status") in ("SIGNAL","SIGNAL (no options)")])
-
-    for s in signals:
-        status = s.get("status", "")
-        sym    = s["symbol"]
-        price  = s.get("price", "-")
-        d      = s.get("direction") or ""
-        dc     = "#3fb950" if d == "CALL" else "#f85149"
-
-        grade       = s.get("grade") or "-"
-        grade_pts   = s.get("grade_pts") or 0
-        grade_color = s.get("grade_color") or "#8b949e"
-        gap_pct     = s.get("gap_pct") or 0
-        gap_dir     = s.get("gap_dir") or "FLAT"
-        rs          = s.get("rs") or 0
-        late        = s.get("late_entry", False)
-        t1_prob     = s.get("t1_prob", 50)
-        t2_prob     = s.get("t2_prob", 25)
-
-        gap_color  = "#3fb950" if gap_dir == "UP" else "#f85149" if gap_dir == "DOWN" else "#8b949e"
-        rs_color   = "#3fb950" if rs >= 0 else "#f85149"
-        gap_sign   = "+" if gap_pct >= 0 else ""
-
-        if status in ("SIGNAL", "SIGNAL (no options)"):
-            has_options = (status == "SIGNAL")
-            bg = "#071a0f" if has_options else "#110d00"
-
-            if d == "CALL":
-                t1   = s.get("und_call_t1", "-")
-                t2   = s.get("und_call_t2", "-")
-                stop = s.get("und_call_stop", "-")
-                arr  = "&#9650;"   # up arrow
-                t_color = "#3fb950"
-                s_color = "#f85149"
-            else:
-                t1   = s.get("und_put_t1", "-")
-                t2   = s.get("und_put_t2", "-")
-                stop = s.get("und_put_stop", "-")
-                arr  = "&#9660;"   # down arrow
-                t_color = "#f85149"
-                s_color = "#3fb950"
-
-            late_tag = ("<span style='margin-left:5px;background:#9e6a03;"
-                        "color:white;padding:1px 5px;border-radius:3px;"
-                        "font-size:9px;vertical-align:middle'>LATE</span>"
-                        if late else "")
-
-            if has_options:
-                prem_html = (
-                    "<div style='font-size:15px;font-weight:600'>"
-                    "${prem}"
-                    "<span style='margin-left:5px;background:#238636;color:white;"
-                    "padding:1px 5px;border-radius:3px;font-size:9px'>LIVE</span>"
-                    "</div>"
-                    "<div style='color:#8b949e;font-size:10px;margin-top:3px'>"
-                    "Stop ${stp} &nbsp;/&nbsp; Tgt ${tgt}</div>"
-                ).format(prem=s.get("premium","-"),
-                         stp=s.get("stop","-"), tgt=s.get("target","-"))
-                action_html = (
-                    "<a href='/take?sym={sym}&dir={d}&prem={prem}&con={con}"
-                    "&stp={stp}&tgt={tgt}&grade={grade}&gpts={gpts}"
-                    "&gap={gpct}&gdir={gdir}&rs={rs:.2f}' "
-                    "style='display:inline-block;background:#238636;color:white;"
-                    "padding:6px 14px;border-radius:6px;text-decoration:none;"
-                    "font-size:12px;font-weight:600'>TAKE</a>"
-                ).format(
-                    sym=sym, d=d,
-                    prem=s.get("premium",""), con=s.get("contracts","1"),
-                    stp=s.get("stop",""), tgt=s.get("target",""),
-                    grade=grade, gpts=grade_pts,
-                    gpct=round(abs(gap_pct),2), gdir=gap_dir, rs=rs
-                )
-            else:
-                prem_html = ("<div style='color:#8b949e;font-size:11px'>"
-                             "Check broker</div>")
-                action_html = ""
-
-            signal_rows += """
-<tr style='border-bottom:1px solid #21262d;background:{bg}'>
-  <td style='padding:10px 8px;vertical-align:top'>
-    <div style='font-size:14px;font-weight:700'>{sym}{late}</div>
-    <div style='font-size:11px;color:{dc};margin-top:2px;font-weight:600'>{arr} {d}</div>
-  </td>
-  <td style='padding:10px 8px;text-align:center;vertical-align:top'>
-    <div style='font-size:28px;font-weight:800;color:{gc};line-height:1'>{grade}</div>
-    <div style='font-size:10px;color:#8b949e;margin-top:2px'>{gpts}pts</div>
-    <div style='font-size:9px;margin-top:4px'>
-      <span style='background:#21262d;color:#8b949e;padding:1px 5px;border-radius:3px'>SIGNAL</span>
-    </div>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top'>
-    <div style='font-size:16px;font-weight:700'>${price}</div>
-    <div style='margin-top:4px;font-size:11px'>
-      <span style='color:{tc}'>T1 ${t1}</span>
-      <span style='color:#8b949e;font-size:10px;margin-left:4px'>{t1p}%</span>
-    </div>
-    <div style='margin-top:2px;font-size:11px'>
-      <span style='color:{tc}'>T2 ${t2}</span>
-      <span style='color:#8b949e;font-size:10px;margin-left:4px'>{t2p}%</span>
-    </div>
-    <div style='margin-top:2px;font-size:11px'>
-      <span style='color:{sc}'>Stop ${stop}</span>
-    </div>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top;font-size:11px'>
-    <div>Gap&nbsp;<span style='color:{gapc};font-weight:600'>{gsign}{gpct}%</span></div>
-    <div style='margin-top:3px'>RS&nbsp;<span style='color:{rsc};font-weight:600'>{rs:+.2f}%</span></div>
-    <div style='margin-top:3px;color:#8b949e'>SPY {spy:+.2f}%</div>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top'>{prem_html}</td>
-  <td style='padding:10px 8px;vertical-align:middle'>{action_html}</td>
-</tr>""".format(
-                bg=bg, sym=sym, late=late_tag, dc=dc, arr=arr, d=d,
-                gc=grade_color, grade=grade, gpts=grade_pts,
-                price=price,
-                t1=t1, t2=t2, stop=stop,
-                tc=t_color, sc=s_color,
-                t1p=int(t1_prob), t2p=int(t2_prob),
-                gapc=gap_color, gsign=gap_sign, gpct=round(abs(gap_pct),2),
-                rsc=rs_color, rs=rs,
-                spy=s.get("spy_chg") or 0,
-                prem_html=prem_html,
-                action_html=action_html
-            )
-
-        elif status == "WATCHING":
-            if d == "CALL":
-                trigger = "Break &gt; ${}".format(s.get("orb_high","-"))
-                t1_w    = s.get("und_call_t1", "-")
-                arr     = "&#9650;"
-            else:
-                trigger = "Break &lt; ${}".format(s.get("orb_low","-"))
-                t1_w    = s.get("und_put_t1", "-")
-                arr     = "&#9660;"
-
-            signal_rows += """
-<tr style='border-bottom:1px solid #21262d'>
-  <td style='padding:10px 8px;vertical-align:top'>
-    <div style='font-size:14px;font-weight:700'>{sym}</div>
-    <div style='font-size:11px;color:{dc};margin-top:2px;font-weight:600'>{arr} {d}</div>
-  </td>
-  <td style='padding:10px 8px;text-align:center;vertical-align:top'>
-    <span style='background:#9e6a03;color:white;padding:4px 8px;
-    border-radius:5px;font-size:11px;font-weight:600'>WATCH</span>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top'>
-    <div style='font-size:16px;font-weight:700'>${price}</div>
-    <div style='font-size:10px;color:#e3b341;margin-top:4px'>{trigger}</div>
-    <div style='font-size:10px;color:#8b949e;margin-top:2px'>If breaks: T1 ${t1}</div>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top;font-size:11px'>
-    <div>Gap&nbsp;<span style='color:{gapc};font-weight:600'>{gsign}{gpct}%</span></div>
-    <div style='margin-top:3px'>RS&nbsp;<span style='color:{rsc};font-weight:600'>{rs:+.2f}%</span></div>
-  </td>
-  <td style='padding:10px 8px;vertical-align:top;font-size:11px;color:#8b949e'>
-    {vs_orb}
-  </td>
-  <td></td>
-</tr>""".format(
-                sym=sym, dc=dc, arr=arr, d=d, price=price,
-                trigger=trigger, t1=t1_w,
-                gapc=gap_color, gsign=gap_sign, gpct=round(abs(gap_pct),2),
-                rsc=rs_color, rs=rs,
-                vs_orb=s.get("vs_orb","-")
-            )
-
-        else:
-            signal_rows += (
-                "<tr style='border-bottom:1px solid #21262d;opacity:0.25'>"
-                "<td style='padding:6px 8px;font-size:12px'>{sym}</td>"
-                "<td colspan='5' style='padding:6px 8px;font-size:11px;"
-                "color:#8b949e'>{status}</td></tr>"
-            ).format(sym=sym, status=status)
-
-    # - Open trades rows -
-    open_rows = ""
-    for t in open_trades:
-        cp = get_current_price(t["symbol"])
-        if cp and t["premium"]:
-            unreal = round((cp - t["premium"]) * 100 * t["contracts"], 2)
-            uc     = "#3fb950" if unreal >= 0 else "#f85149"
-            us     = "<span style='color:{};font-weight:600'>${}</span>".format(uc, unreal)
-        else:
-            us = "<span style='color:#8b949e'>-</span>"
-        open_rows += (
-            "<tr style='border-bottom:1px solid #21262d'>"
-            "<td style='padding:10px 8px;font-weight:700'>{sym}</td>"
-            "<td style='padding:10px 8px;color:{dc}'>{dir}</td>"
-            "<td style='padding:10px 8px'>${prem}</td>"
-            "<td style='padding:10px 8px'>{con}x</td>"
-            "<td style='padding:10px 8px'>{unreal}</td>"
-            "<td style='padding:10px 8px'>"
-            "<a href='/close?id={id}&outcome=WIN&exit={cp}' "
-            "style='background:#238636;color:white;padding:5px 10px;"
-            "border-radius:5px;text-decoration:none;font-size:11px;"
-            "font-weight:600;margin-right:5px'>WIN</a>"
-            "<a href='/close?id={id}&outcome=LOSS&exit={cp}' "
-            "style='background:#da3633;color:white;padding:5px 10px;"
-            "border-radius:5px;text-decoration:none;font-size:11px;"
-            "font-weight:600'>LOSS</a>"
-            "</td></tr>"
-        ).format(
-            sym=t["symbol"],
-            dc="#3fb950" if t["direction"]=="CALL" else "#f85149",
-            dir=t["direction"], prem=t["premium"], con=t["contracts"],
-            unreal=us, id=t["id"], cp=cp or 0
-        )
-
-    # - Closed trades rows -
-    closed_rows = ""
-    for t in closed:
-        pc = "#3fb950" if (t["pnl"] or 0) >= 0 else "#f85149"
-        oc = "#3fb950" if t["outcome"] == "WIN" else "#f85149"
-        closed_rows += (
-            "<tr style='border-bottom:1px solid #21262d'>"
-            "<td style='padding:10px 8px;font-weight:700'>{sym}</td>"
-            "<td style='padding:10px 8px;color:{dc}'>{dir}</td>"
-            "<td style='padding:10px 8px'>${prem}</td>"
-            "<td style='padding:10px 8px;color:{oc};font-weight:600'>{out}</td>"
-            "<td style='padding:10px 8px;color:{pc};font-weight:600'>${pnl}</td>"
-            "</tr>"
-        ).format(
-            sym=t["symbol"],
-            dc="#3fb950" if t["direction"]=="CALL" else "#f85149",
-            dir=t["direction"], prem=t["premium"],
-            oc=oc, out=t["outcome"], pc=pc, pnl=round(t["pnl"] or 0, 2)
-        )
-
-    # - HTML -
-    empty_scanner = (
-        "<tr><td colspan='6' style='padding:20px;text-align:center;"
-        "color:#8b949e;font-size:13px'>Waiting for next scan...</td></tr>"
-    )
-    empty_open = (
-        "<tr><td colspan='6' style='padding:20px;text-align:center;"
-        "color:#8b949e;font-size:13px'>No open trades</td></tr>"
-    )
-    empty_closed = (
-        "<tr><td colspan='5' style='padding:20px;text-align:center;"
-        "color:#8b949e;font-size:13px'>No closed trades today</td></tr>"
-    )
-
-    html = """<!DOCTYPE html>
+# Page and row templates, built once at import. The CSS is served from its
+# own long-cached URL (versioned by content hash) so the 30s refresh only
+# re-sends the markup; the head is a plain string so str.format only scans
+# the dynamic body on each render.
+DASHBOARD_CSS = """
+  * { box-sizing:border-box; margin:0; padding:0 }
+  body { background:#0d1117; color:#e6edf3; font-family:-apple-system,Arial,sans-serif; padding:12px }
+  h1 { font-size:17px; font-weight:700; margin-bottom:4px }
+  .topbar { font-size:11px; color:#8b949e; margin-bottom:14px; display:flex; align-items:center; gap:8px; flex-wrap:wrap }
+  .dot { width:7px; height:7px; border-radius:50%; display:inline-block; margin-right:3px }
+  .card { background:#161b22; border:1px solid #30363d; border-radius:10px; margin-bottom:14px; overflow:hidden }
+  .card-header { padding:11px 14px; border-bottom:1px solid #30363d; display:flex; justify-content:space-between; align-items:center }
+  .card-title { font-size:13px; font-weight:600; color:#e6edf3 }
+  .card-sub { font-size:11px; color:#8b949e }
+  .stats-grid { display:grid; grid-template-columns:repeat(4,1fr); gap:8px; margin-bottom:14px }
+  .stat-box { background:#161b22; border:1px solid #30363d; border-radius:8px; padding:11px; text-align:center }
+  .stat-val { font-size:20px; font-weight:700; line-height:1 }
+  .stat-lbl { font-size:10px; color:#8b949e; margin-top:4px }
+  table { width:100%; border-collapse:collapse }
+  th { padding:9px 8px; text-align:left; font-size:11px; font-weight:600; color:#8b949e; border-bottom:1px solid #30363d; text-transform:uppercase; letter-spacing:.5px }
+  .nav-link { color:#58a6ff; text-decoration:none; font-size:11px; font-weight:500 }
+  .nav-link:hover { text-decoration:underline }
+  .debug-box { background:#010409; border-radius:6px; padding:10px; font-size:10px; font-family:monospace; max-height:180px; overflow-y:auto; color:#8b949e; line-height:1.6 }
+  .grade-pill { display:inline-block; padding:2px 8px; border-radius:4px; font-size:10px; font-weight:700 }
+"""
+
+DASHBOARD_CSS_BYTES = DASHBOARD_CSS.encode()
+DASHBOARD_CSS_ETAG  = hashlib.blake2b(DASHBOARD_CSS_BYTES, digest_size=16).hexdigest()
+
+DASHBOARD_HEAD = """<!DOCTYPE html>
 <html><head>
 <meta http-equiv='refresh' content='30'>
 <meta name='viewport' content='width=device-width,initial-scale=1'>
-<style>
-  * {{ box-sizing:border-box; margin:0; padding:0 }}
-  body {{ background:#0d1117; color:#e6edf3; font-family:-apple-system,Arial,sans-serif; padding:12px }}
-  h1 {{ font-size:17px; font-weight:700; margin-bottom:4px }}
-  .topbar {{ font-size:11px; color:#8b949e; margin-bottom:14px; display:flex; align-items:center; gap:8px; flex-wrap:wrap }}
-  .dot {{ width:7px; height:7px; border-radius:50%; display:inline-block; margin-right:3px }}
-  .card {{ background:#161b22; border:1px solid #30363d; border-radius:10px; margin-bottom:14px; overflow:hidden }}
-  .card-header {{ padding:11px 14px; border-bottom:1px solid #30363d; display:flex; justify-content:space-between; align-items:center }}
-  .card-title {{ font-size:13px; font-weight:600; color:#e6edf3 }}
-  .card-sub {{ font-size:11px; color:#8b949e }}
-  .stats-grid {{ display:grid; grid-template-columns:repeat(4,1fr); gap:8px; margin-bottom:14px }}
-  .stat-box {{ background:#161b22; border:1px solid #30363d; border-radius:8px; padding:11px; text-align:center }}
-  .stat-val {{ font-size:20px; font-weight:700; line-height:1 }}
-  .stat-lbl {{ font-size:10px; color:#8b949e; margin-top:4px }}
-  table {{ width:100%; border-collapse:collapse }}
-  th {{ padding:9px 8px; text-align:left; font-size:11px; font-weight:600; color:#8b949e; border-bottom:1px solid #30363d; text-transform:uppercase; letter-spacing:.5px }}
-  .nav-link {{ color:#58a6ff; text-decoration:none; font-size:11px; font-weight:500 }}
-  .nav-link:hover {{ text-decoration:underline }}
-  .debug-box {{ background:#010409; border-radius:6px; padding:10px; font-size:10px; font-family:monospace; max-height:180px; overflow-y:auto; color:#8b949e; line-height:1.6 }}
-  .grade-pill {{ display:inline-block; padding:2px 8px; border-radius:4px; font-size:10px; font-weight:700 }}
-</style>
+<link rel='stylesheet' href='/static/dashboard.css?v={}'>
 </head><body>
+""".format(DASHBOARD_CSS_ETAG[:12])
+
+DASHBOARD_HEAD_BYTES = DASHBOARD_HEAD.encode()
 
+DASHBOARD_BODY = """
 <h1>Institutional 0DTE Engine</h1>
 <div class='topbar'>
   <span><span class='dot' style='background:{mc}'></span><span style='color:{mc};font-weight:600'>{ms}</span></span>
-  <span>Next scan {sc}s</span>
+  <span>Next scan <span id='nsc' data-at='{sa}'>-</span>s</span>
   <span>Bot <span style='color:{bc};font-weight:600'>{be}</span></span>
   <span style='margin-left:4px'>
     <a class='nav-link' href='/stats'>Stats</a> &nbsp;
@@ -1487,28 +1739,370 @@ def render_dashboard():
   <div class='debug-box'>{ll}</div>
 </div>
 
-</body></html>""".format(
+<script>
+  var nsc = document.getElementById('nsc');
+  nsc.textContent = Math.max(0, Math.floor(nsc.dataset.at - Date.now() / 1000));
+</script>
+</body></html>"""
+
+# DASHBOARD_BODY pre-parsed into (literal, field, spec) runs for fill_segments
+DASHBOARD_SEGMENTS = [(lit, field, spec) for lit, field, spec, _
+                      in string.Formatter().parse(DASHBOARD_BODY)]
+
+
+def fill_segments(segments, values):
+    """Render pre-parsed template segments with values (a dict)."""
+    return "".join([lit + (format(values[field], spec) if field is not None else "")
+                    for lit, field, spec in segments])
+
+
+SIGNAL_ROW_HTML = """
+<tr style='border-bottom:1px solid #21262d;background:{bg}'>
+  <td style='padding:10px 8px;vertical-align:top'>
+    <div style='font-size:14px;font-weight:700'>{sym}{late}</div>
+    <div style='font-size:11px;color:{dc};margin-top:2px;font-weight:600'>{arr} {d}</div>
+  </td>
+  <td style='padding:10px 8px;text-align:center;vertical-align:top'>
+    <div style='font-size:28px;font-weight:800;color:{gc};line-height:1'>{grade}</div>
+    <div style='font-size:10px;color:#8b949e;margin-top:2px'>{gpts}pts</div>
+    <div style='font-size:9px;margin-top:4px'>
+      <span style='background:#21262d;color:#8b949e;padding:1px 5px;border-radius:3px'>SIGNAL</span>
+    </div>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top'>
+    <div style='font-size:16px;font-weight:700'>${price}</div>
+    <div style='margin-top:4px;font-size:11px'>
+      <span style='color:{tc}'>T1 ${t1}</span>
+      <span style='color:#8b949e;font-size:10px;margin-left:4px'>{t1p}%</span>
+    </div>
+    <div style='margin-top:2px;font-size:11px'>
+      <span style='color:{tc}'>T2 ${t2}</span>
+      <span style='color:#8b949e;font-size:10px;margin-left:4px'>{t2p}%</span>
+    </div>
+    <div style='margin-top:2px;font-size:11px'>
+      <span style='color:{sc}'>Stop ${stop}</span>
+    </div>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top;font-size:11px'>
+    <div>Gap&nbsp;<span style='color:{gapc};font-weight:600'>{gsign}{gpct}%</span></div>
+    <div style='margin-top:3px'>RS&nbsp;<span style='color:{rsc};font-weight:600'>{rs:+.2f}%</span></div>
+    <div style='margin-top:3px;color:#8b949e'>SPY {spy:+.2f}%</div>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top'>{prem_html}</td>
+  <td style='padding:10px 8px;vertical-align:middle'>{action_html}</td>
+</tr>"""
+
+LATE_TAG_HTML = (
+    "<span style='margin-left:5px;background:#9e6a03;"
+    "color:white;padding:1px 5px;border-radius:3px;"
+    "font-size:9px;vertical-align:middle'>LATE</span>"
+)
+
+LIVE_PREMIUM_HTML = (
+    "<div style='font-size:15px;font-weight:600'>"
+    "${prem}"
+    "<span style='margin-left:5px;background:#238636;color:white;"
+    "padding:1px 5px;border-radius:3px;font-size:9px'>LIVE</span>"
+    "</div>"
+    "<div style='color:#8b949e;font-size:10px;margin-top:3px'>"
+    "Stop ${stp} &nbsp;/&nbsp; Tgt ${tgt}</div>"
+)
+
+NO_OPTIONS_HTML = "<div style='color:#8b949e;font-size:11px'>Check broker</div>"
+
+TAKE_BUTTON_HTML = (
+    "<a href='/take?sym={sym}&dir={d}&prem={prem}&con={con}"
+    "&stp={stp}&tgt={tgt}&grade={grade}&gpts={gpts}"
+    "&gap={gpct}&gdir={gdir}&rs={rs:.2f}' "
+    "style='display:inline-block;background:#238636;color:white;"
+    "padding:6px 14px;border-radius:6px;text-decoration:none;"
+    "font-size:12px;font-weight:600'>TAKE</a>"
+)
+
+SKIP_ROW_HTML = (
+    "<tr style='border-bottom:1px solid #21262d;opacity:0.25'>"
+    "<td style='padding:6px 8px;font-size:12px'>{sym}</td>"
+    "<td colspan='5' style='padding:6px 8px;font-size:11px;"
+    "color:#8b949e'>{status}</td></tr>"
+)
+
+UNREAL_HTML    = "<span style='color:{};font-weight:600'>${}</span>"
+NO_UNREAL_HTML = "<span style='color:#8b949e'>-</span>"
+
+OPEN_ROW_HTML = (
+    "<tr style='border-bottom:1px solid #21262d'>"
+    "<td style='padding:10px 8px;font-weight:700'>{sym}</td>"
+    "<td style='padding:10px 8px;color:{dc}'>{dir}</td>"
+    "<td style='padding:10px 8px'>${prem}</td>"
+    "<td style='padding:10px 8px'>{con}x</td>"
+    "<td style='padding:10px 8px'>{unreal}</td>"
+    "<td style='padding:10px 8px'>"
+    "<a href='/close?id={id}&outcome=WIN&exit={cp}' "
+    "style='background:#238636;color:white;padding:5px 10px;"
+    "border-radius:5px;text-decoration:none;font-size:11px;"
+    "font-weight:600;margin-right:5px'>WIN</a>"
+    "<a href='/close?id={id}&outcome=LOSS&exit={cp}' "
+    "style='background:#da3633;color:white;padding:5px 10px;"
+    "border-radius:5px;text-decoration:none;font-size:11px;"
+    "font-weight:600'>LOSS</a>"
+    "</td></tr>"
+)
+
+CLOSED_ROW_HTML = (
+    "<tr style='border-bottom:1px solid #21262d'>"
+    "<td style='padding:10px 8px;font-weight:700'>{sym}</td>"
+    "<td style='padding:10px 8px;color:{dc}'>{dir}</td>"
+    "<td style='padding:10px 8px'>${prem}</td>"
+    "<td style='padding:10px 8px;color:{oc};font-weight:600'>{out}</td>"
+    "<td style='padding:10px 8px;color:{pc};font-weight:600'>${pnl}</td>"
+    "</tr>"
+)
+
+EMPTY_SCANNER_HTML = (
+    "<tr><td colspan='6' style='padding:20px;text-align:center;"
+    "color:#8b949e;font-size:13px'>Waiting for next scan...</td></tr>"
+)
+EMPTY_OPEN_HTML = (
+    "<tr><td colspan='6' style='padding:20px;text-align:center;"
+    "color:#8b949e;font-size:13px'>No open trades</td></tr>"
+)
+EMPTY_CLOSED_HTML = (
+    "<tr><td colspan='5' style='padding:20px;text-align:center;"
+    "color:#8b949e;font-size:13px'>No closed trades today</td></tr>"
+)
+
+WATCH_ROW_HTML = """
+<tr style='border-bottom:1px solid #21262d'>
+  <td style='padding:10px 8px;vertical-align:top'>
+    <div style='font-size:14px;font-weight:700'>{sym}</div>
+    <div style='font-size:11px;color:{dc};margin-top:2px;font-weight:600'>{arr} {d}</div>
+  </td>
+  <td style='padding:10px 8px;text-align:center;vertical-align:top'>
+    <span style='background:#9e6a03;color:white;padding:4px 8px;
+    border-radius:5px;font-size:11px;font-weight:600'>WATCH</span>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top'>
+    <div style='font-size:16px;font-weight:700'>${price}</div>
+    <div style='font-size:10px;color:#e3b341;margin-top:4px'>{trigger}</div>
+    <div style='font-size:10px;color:#8b949e;margin-top:2px'>If breaks: T1 ${t1}</div>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top;font-size:11px'>
+    <div>Gap&nbsp;<span style='color:{gapc};font-weight:600'>{gsign}{gpct}%</span></div>
+    <div style='margin-top:3px'>RS&nbsp;<span style='color:{rsc};font-weight:600'>{rs:+.2f}%</span></div>
+  </td>
+  <td style='padding:10px 8px;vertical-align:top;font-size:11px;color:#8b949e'>
+    {vs_orb}
+  </td>
+  <td></td>
+</tr>"""
+
+
+# Direction-dependent signal row fields:
+# (t1 key, t2 key, stop key, arrow, target color, stop color)
+CALL_SIDE = ("und_call_t1", "und_call_t2", "und_call_stop", "&#9650;", "#3fb950", "#f85149")
+PUT_SIDE  = ("und_put_t1",  "und_put_t2",  "und_put_stop",  "&#9660;", "#f85149", "#3fb950")
+
+
+def gap_rs_fields(s):
+    """Gap / relative-strength cells shared by SIGNAL and WATCH rows."""
+    gap_pct = s.get("gap_pct") or 0
+    gap_dir = s.get("gap_dir") or "FLAT"
+    rs      = s.get("rs") or 0
+    return dict(
+        gapc="#3fb950" if gap_dir == "UP" else "#f85149" if gap_dir == "DOWN" else "#8b949e",
+        gsign="+" if gap_pct >= 0 else "",
+        gpct=round(abs(gap_pct), 2),
+        rsc="#3fb950" if rs >= 0 else "#f85149",
+        rs=rs
+    )
+
+
+def render_signal_row(s):
+    sym         = s["symbol"]
+    d           = s.get("direction") or ""
+    has_options = s.get("status") == "SIGNAL"
+    grade       = s.get("grade") or "-"
+    grade_pts   = s.get("grade_pts") or 0
+    gap_rs      = gap_rs_fields(s)
+    t1_key, t2_key, stop_key, arr, t_color, s_color = CALL_SIDE if d == "CALL" else PUT_SIDE
+
+    if has_options:
+        prem_html = LIVE_PREMIUM_HTML.format(
+            prem=s.get("premium","-"),
+            stp=s.get("stop","-"), tgt=s.get("target","-"))
+        action_html = TAKE_BUTTON_HTML.format(
+            sym=sym, d=d,
+            prem=s.get("premium",""), con=s.get("contracts","1"),
+            stp=s.get("stop",""), tgt=s.get("target",""),
+            grade=grade, gpts=grade_pts,
+            gpct=gap_rs["gpct"], gdir=s.get("gap_dir") or "FLAT", rs=gap_rs["rs"]
+        )
+    else:
+        prem_html   = NO_OPTIONS_HTML
+        action_html = ""
+
+    return SIGNAL_ROW_HTML.format(
+        bg="#071a0f" if has_options else "#110d00",
+        sym=sym, late=LATE_TAG_HTML if s.get("late_entry", False) else "",
+        dc="#3fb950" if d == "CALL" else "#f85149", arr=arr, d=d,
+        gc=s.get("grade_color") or "#8b949e", grade=grade, gpts=grade_pts,
+        price=s.get("price", "-"),
+        t1=s.get(t1_key, "-"), t2=s.get(t2_key, "-"), stop=s.get(stop_key, "-"),
+        tc=t_color, sc=s_color,
+        t1p=int(s.get("t1_prob", 50)), t2p=int(s.get("t2_prob", 25)),
+        spy=s.get("spy_chg") or 0,
+        prem_html=prem_html,
+        action_html=action_html,
+        **gap_rs
+    )
+
+
+def render_watch_row(s):
+    d = s.get("direction") or ""
+    if d == "CALL":
+        trigger = "Break &gt; ${}".format(s.get("orb_high","-"))
+        t1_w    = s.get("und_call_t1", "-")
+        arr     = "&#9650;"
+    else:
+        trigger = "Break &lt; ${}".format(s.get("orb_low","-"))
+        t1_w    = s.get("und_put_t1", "-")
+        arr     = "&#9660;"
+
+    return WATCH_ROW_HTML.format(
+        sym=s["symbol"], dc="#3fb950" if d == "CALL" else "#f85149",
+        arr=arr, d=d, price=s.get("price", "-"),
+        trigger=trigger, t1=t1_w,
+        vs_orb=s.get("vs_orb","-"),
+        **gap_rs_fields(s)
+    )
+
+
+def render_skip_row(s):
+    return SKIP_ROW_HTML.format(sym=s["symbol"], status=s.get("status", ""))
+
+
+# Scanner row renderer by status; anything else renders as a dimmed skip row
+ROW_RENDERERS = {
+    "SIGNAL":              render_signal_row,
+    "SIGNAL (no options)": render_signal_row,
+    "WATCHING":            render_watch_row,
+}
+
+
+# (state key, pinned objects, encoded body, etag) of the last render
+_dashboard_cache = (None, None, b"", "")
+
+def cached_dashboard_body():
+    """
+    Encoded dashboard body and its ETag, re-rendered only when something
+    it shows has changed: a scan swap, a new log line, a trade write, the
+    bot toggle or the ET date. The objects compared by id() are pinned in
+    the cache entry so their ids cannot be reused while it is current.
+    """
+    global _dashboard_cache
+    today = et_today()
+    with state_lock:
+        pins = (all_signals, open_prices, debug_log[-1] if debug_log else None)
+        key  = (tuple(map(id, pins)), int(next_scan_at), market_is_open,
+                bot_enabled, trades_version, today)
+    cached = _dashboard_cache
+    if cached[0] == key:
+        return cached[2], cached[3]
+    body = render_dashboard_body().encode()
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    _dashboard_cache = (key, pins, body, etag)
+    return body, etag
+
+
+def render_dashboard_body():
+    # Reads only the scanner's snapshot and SQLite - no network calls
+    with state_lock:
+        signals = list(all_signals)
+        scan_at = int(next_scan_at)
+        logs    = recent_logs(30)
+        is_open = market_is_open
+        prices  = dict(open_prices)
+
+    open_trades, closed, totals = db_get_dashboard_snapshot()
+    total_pnl, wins, losses, n_closed = totals
+    win_rate    = round(wins / n_closed * 100) if n_closed else 0
+
+    market_color  = "#3fb950" if is_open else "#f85149"
+    market_status = "OPEN" if is_open else "CLOSED"
+    pnl_color     = "#3fb950" if total_pnl >= 0 else "#f85149"
+
+    # - Signal rows -
+    active_count = len([s for s in signals if s.get("status") in ("SIGNAL","SIGNAL (no options)")])
+    signal_rows  = [ROW_RENDERERS.get(s.get("status", ""), render_skip_row)(s)
+                    for s in signals]
+
+    # - Open trades rows -
+    open_rows = []
+    for t in open_trades:
+        cp = prices.get(t["symbol"])
+        if cp and t["premium"]:
+            unreal = round((cp - t["premium"]) * 100 * t["contracts"], 2)
+            uc     = "#3fb950" if unreal >= 0 else "#f85149"
+            us     = UNREAL_HTML.format(uc, unreal)
+        else:
+            us = NO_UNREAL_HTML
+        open_rows.append(OPEN_ROW_HTML.format(
+            sym=t["symbol"],
+            dc="#3fb950" if t["direction"]=="CALL" else "#f85149",
+            dir=t["direction"], prem=t["premium"], con=t["contracts"],
+            unreal=us, id=t["id"], cp=cp or 0
+        ))
+
+    # - Closed trades rows -
+    closed_rows = []
+    for t in closed:
+        pc = "#3fb950" if (t["pnl"] or 0) >= 0 else "#f85149"
+        oc = "#3fb950" if t["outcome"] == "WIN" else "#f85149"
+        closed_rows.append(CLOSED_ROW_HTML.format(
+            sym=t["symbol"],
+            dc="#3fb950" if t["direction"]=="CALL" else "#f85149",
+            dir=t["direction"], prem=t["premium"],
+            oc=oc, out=t["outcome"], pc=pc, pnl=round(t["pnl"] or 0, 2)
+        ))
+
+    # - HTML -
+    html = fill_segments(DASHBOARD_SEGMENTS, dict(
         mc=market_color, ms=market_status,
-        sc=secs,
+        sa=scan_at,
         bc="#3fb950" if bot_enabled else "#f85149",
         be="ON" if bot_enabled else "PAUSED",
         pc=pnl_color, pl=round(total_pnl, 2),
-        nt=len(closed), nw=wins,
+        nt=n_closed, nw=wins,
         wr=win_rate,
         wrc="#3fb950" if win_rate >= 50 else "#f85149",
         ns=active_count,
-        sr=signal_rows or empty_scanner,
-        or_=open_rows or empty_open,
-        cr=closed_rows or empty_closed,
+        sr="".join(signal_rows) or EMPTY_SCANNER_HTML,
+        or_="".join(open_rows) or EMPTY_OPEN_HTML,
+        cr="".join(closed_rows) or EMPTY_CLOSED_HTML,
         ll="<br>".join(logs) if logs else "No logs yet"
-    )
+    ))
     return html
 
 
-
 @app.route("/")
 def home():
-    return render_dashboard()
+    # Static head goes out pre-encoded; the body is rendered once per state
+    # change. The countdown is computed client-side from the scan timestamp,
+    # so the 30s meta refresh gets a bodiless 304 while the ETag matches.
+    body, etag = cached_dashboard_body()
+    resp = Response(DASHBOARD_HEAD_BYTES + body, mimetype="text/html")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+
+@app.route("/static/dashboard.css")
+def dashboard_css():
+    # The URL carries the content hash, so browsers may keep it for a day
+    resp = Response(DASHBOARD_CSS_BYTES, mimetype="text/css")
+    resp.set_etag(DASHBOARD_CSS_ETAG)
+    resp.headers["Cache-Control"] = "public, max-age=86400, immutable"
+    return resp.make_conditional(request)
 
 
 @app.route("/take")
@@ -1561,12 +2155,31 @@ def close_trade():
     return redirect("/")
 
 
+STAT_ROW_HTML = (
+    "<tr style='border-bottom:1px solid #21262d'>"
+    "<td style='padding:8px'>{}</td>"
+    "<td style='padding:8px'>{}</td>"
+    "<td style='padding:8px;color:{}'>{:.0f}%</td>"
+    "<td style='padding:8px'>{}/{}</td>"
+    "<td style='padding:8px;color:{}'>${}</td>"
+    "</tr>"
+)
+
+HOUR_ROW_HTML = (
+    "<tr style='border-bottom:1px solid #21262d'>"
+    "<td style='padding:8px'>{}</td>"
+    "<td style='padding:8px'>{}</td>"
+    "<td style='padding:8px;color:{}'>{:.0f}%</td>"
+    "<td style='padding:8px;color:{}'>${}</td>"
+    "</tr>"
+)
+
+
 @app.route("/stats")
 def stats_page():
     """Win rate breakdown by symbol, grade, hour, direction."""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c    = conn.cursor()
+        c    = get_conn().cursor()
         c.execute("""
             SELECT symbol, direction, outcome, pnl, r_mult,
                    grade, grade_pts, gap_pct, gap_dir, rs, entry_hour, ts
@@ -1574,7 +2187,6 @@ def stats_page():
             ORDER BY ts DESC
         """)
         rows = c.fetchall()
-        conn.close()
     except Exception as e:
         return "DB error: {}".format(e)
 
@@ -1609,7 +2221,7 @@ def stats_page():
             if k not in groups:
                 groups[k] = []
             groups[k].append(t)
-        rows_html = ""
+        rows_html = []
         for k in sorted(groups.keys()):
             g   = groups[k]
             gw  = len([x for x in g if x["outcome"] == "WIN"])
@@ -1618,16 +2230,9 @@ def stats_page():
             gpnl = round(sum(x["pnl"] for x in g), 2)
             pc  = "#3fb950" if gpnl >= 0 else "#f85149"
             wrc = "#3fb950" if gwr >= 55 else "#e3b341" if gwr >= 45 else "#f85149"
-            rows_html += (
-                "<tr style='border-bottom:1px solid #21262d'>"
-                "<td style='padding:8px'>{}</td>"
-                "<td style='padding:8px'>{}</td>"
-                "<td style='padding:8px;color:{}'>{:.0f}%</td>"
-                "<td style='padding:8px'>{}/{}</td>"
-                "<td style='padding:8px;color:{}'>${}</td>"
-                "</tr>"
-            ).format(k, len(g), wrc, gwr, gw, gl, pc, gpnl)
-        return rows_html
+            rows_html.append(STAT_ROW_HTML.format(
+                k, len(g), wrc, gwr, gw, gl, pc, gpnl))
+        return "".join(rows_html)
 
     def hour_label(h):
         if h < 10:   return "9:30-10:00"
@@ -1644,7 +2249,7 @@ def stats_page():
         if k not in hour_groups: hour_groups[k] = []
         hour_groups[k].append(t)
 
-    hour_rows = ""
+    hour_rows = []
     for k in ["9:30-10:00","10:00-11:00","11:00-12:00",
                "12:00-1:00","1:00-2:00","2:00+ LATE"]:
         if k not in hour_groups: continue
@@ -1654,14 +2259,7 @@ def stats_page():
         gpnl = round(sum(x["pnl"] for x in g), 2)
         pc  = "#3fb950" if gpnl >= 0 else "#f85149"
         wrc = "#3fb950" if gwr >= 55 else "#e3b341" if gwr >= 45 else "#f85149"
-        hour_rows += (
-            "<tr style='border-bottom:1px solid #21262d'>"
-            "<td style='padding:8px'>{}</td>"
-            "<td style='padding:8px'>{}</td>"
-            "<td style='padding:8px;color:{}'>{:.0f}%</td>"
-            "<td style='padding:8px;color:{}'>${}</td>"
-            "</tr>"
-        ).format(k, len(g), wrc, gwr, pc, gpnl)
+        hour_rows.append(HOUR_ROW_HTML.format(k, len(g), wrc, gwr, pc, gpnl))
 
     html = """<!DOCTYPE html><html><head>
 <meta name='viewport' content='width=device-width,initial-scale=1'>
@@ -1727,7 +2325,7 @@ a.nav{{color:#58a6ff;text-decoration:none;font-size:12px}}
         sym_rows=stat_rows("symbol", "Symbol"),
         grade_rows=stat_rows("grade", "Grade"),
         dir_rows=stat_rows("direction", "Direction"),
-        hour_rows=hour_rows,
+        hour_rows="".join(hour_rows),
         recent_rows="".join([
             "<tr style='border-bottom:1px solid #21262d'>"
             "<td style='padding:8px'>{}</td>"
@@ -1753,26 +2351,30 @@ a.nav{{color:#58a6ff;text-decoration:none;font-size:12px}}
 
 @app.route("/debug")
 def debug_route():
+    # Copy under the lock, serialize (via the orjson provider) outside it
     with state_lock:
-        return jsonify({"signals": all_signals, "log": debug_log[-50:]})
+        signals = list(all_signals)
+    return jsonify({"signals": signals, "log": recent_logs(50)})
 
 
-@app.route("/alpaca-test")
-def alpaca_test():
-    results = {}
-    try:
-        r = requests.get(CLOCK_URL, headers=HEADERS, timeout=5)
-        results["clock"] = {"status": r.status_code,
-                             "body": r.json() if r.status_code==200 else r.text}
-    except Exception as e:
-        results["clock"] = {"error": str(e)}
+def alpaca_probe(url, params=None, timeout=10, limit=None):
+    """One /alpaca-test call: status plus parsed body (or raw text[:limit])."""
     try:
-        r = requests.get(DATA_URL.format("SPY"), headers=HEADERS,
-                         params={"timeframe":"5Min","limit":3}, timeout=10)
-        results["spy_bars"] = {"status": r.status_code,
-                                "body": r.json() if r.status_code==200 else r.text[:300]}
+        r = SESSION.get(url, params=params, timeout=timeout)
+        return {"status": r.status_code,
+                "body": fast_json.loads(r.content) if r.status_code==200 else r.text[:limit]}
     except Exception as e:
-        results["spy_bars"] = {"error": str(e)}
+        return {"error": str(e)}
+
+
+@app.route("/alpaca-test")
+def alpaca_test():
+    # Independent calls - run together so the page waits on the slower one
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        clock    = ex.submit(alpaca_probe, CLOCK_URL, None, 5)
+        spy_bars = ex.submit(alpaca_probe, BARS_URL.format("SPY"),
+                             {"timeframe":"5Min","limit":3}, 10, 300)
+        results  = {"clock": clock.result(), "spy_bars": spy_bars.result()}
     return jsonify(results)
 
 
@@ -1780,24 +2382,21 @@ def alpaca_test():
 def tradier_test():
     """Test Tradier options data for SPY - shows live chain."""
     results = {"token_set": bool(TRADIER_TOKEN)}
-    et        = pytz.timezone("America/New_York")
-    today_str = datetime.now(et).strftime("%Y-%m-%d")
+    today_str = et_today()
     try:
-        r = requests.get("{}/markets/options/expirations".format(TRADIER_URL),
-                         headers=TRADIER_HEADERS,
-                         params={"symbol": "SPY", "includeAllRoots": "true"},
-                         timeout=10)
+        r = TRADIER_SESSION.get("{}/markets/options/expirations".format(TRADIER_URL),
+                                params={"symbol": "SPY", "includeAllRoots": "true"},
+                                timeout=10)
         results["expirations"] = {"status": r.status_code,
-                                   "body": r.json() if r.status_code==200 else r.text[:300]}
+                                   "body": fast_json.loads(r.content) if r.status_code==200 else r.text[:300]}
     except Exception as e:
         results["expirations"] = {"error": str(e)}
     try:
-        r2 = requests.get("{}/markets/options/chains".format(TRADIER_URL),
-                          headers=TRADIER_HEADERS,
-                          params={"symbol": "SPY", "expiration": today_str,
-                                  "greeks": "true"},
-                          timeout=10)
-        body = r2.json() if r2.status_code == 200 else r2.text[:500]
+        r2 = TRADIER_SESSION.get("{}/markets/options/chains".format(TRADIER_URL),
+                                 params={"symbol": "SPY", "expiration": today_str,
+                                         "greeks": "true"},
+                                 timeout=10)
+        body = fast_json.loads(r2.content) if r2.status_code == 200 else r2.text[:500]
         # Trim chain to first 5 ATM contracts only for readability
         if r2.status_code == 200:
             chain = (body.get("options") or {}).get("option", [])
@@ -1814,12 +2413,13 @@ def tradier_test():
 
 @app.route("/telegram-test")
 def telegram_test():
-    ok = send_telegram("Test from your 0DTE Engine - Telegram is working!")
+    ok = post_telegram("Test from your 0DTE Engine - Telegram is working!")
+    logs = recent_logs(20)
     return jsonify({
         "sent":         ok,
         "token_length": len(os.getenv("TELEGRAM_BOT_TOKEN","")),
         "chat_id":      os.getenv("TELEGRAM_CHAT_ID",""),
-        "log":          debug_log[-20:]
+        "log":          logs
     })
 
 
@@ -1845,11 +2445,11 @@ def token_check():
         result["hash_length"]  = len(parts[1])
     # Try getMe to verify token with Telegram
     try:
-        r = requests.get(
+        r = TG_SESSION.get(
             "https://api.telegram.org/bot{}/getMe".format(token),
             timeout=5)
         result["getMe_status"] = r.status_code
-        result["getMe_body"]   = r.json()
+        result["getMe_body"]   = fast_json.loads(r.content)
     except Exception as e:
         result["getMe_error"] = str(e)
     return jsonify(result)
@@ -1862,6 +2462,7 @@ def token_check():
 init_db()
 threading.Thread(target=background_scheduler, daemon=True).start()
 threading.Thread(target=telegram_poller,      daemon=True).start()
+threading.Thread(target=telegram_sender,      daemon=True).start()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
@@ -5,25 +5,26 @@
 
 import requests
 import os
-import statistics
 import csv
+import json
+import numpy as np
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from collections import defaultdict
+from urllib3.util.retry import Retry
+
+try:
+    import orjson as fast_json    # C parser for multi-MB bar pages
+except ImportError:
+    fast_json = json
+
+from alpaca_config import ALPACA_KEY, ALPACA_SECRET, HEADERS, BARS_URL
 
 # =============================================
 # CONFIGURATION
 # =============================================
 
-ALPACA_KEY    = os.getenv("APCA_API_KEY_ID", "").strip()
-ALPACA_SECRET = os.getenv("APCA_API_SECRET_KEY", "").strip()
-
-HEADERS = {
-    "APCA-API-KEY-ID":     ALPACA_KEY,
-    "APCA-API-SECRET-KEY": ALPACA_SECRET
-}
-
-BARS_URL = "https://data.alpaca.markets/v2/stocks/{}/bars"
-
 # Backtest window
 START_DATE = "2024-01-01"
 END_DATE   = "2024-12-31"
@@ -53,18 +54,53 @@ CORRELATION_PAIRS = [("SPY", "QQQ")]
 TRADE_LOG_FILE   = "trade_log.csv"
 EQUITY_LOG_FILE  = "equity_curve.csv"
 
+# On-disk cache of fetched bars (historical windows never change)
+CACHE_DIR        = ".cache"
+
+# Bar fields the backtest reads; n / vw are dropped at fetch time
+BAR_FIELDS       = ("t", "o", "h", "l", "c", "v")
+
 
 # =============================================
 # DATA FETCHING
 # =============================================
 
-def fetch_bars(symbol, start, end, timeframe="5Min"):
+# One keep-alive pool shared by the per-symbol fetch threads
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=2, pool_maxsize=len(SYMBOLS),
+    max_retries=Retry(total=2, backoff_factor=0.2,
+                      status_forcelist=(429, 500, 502, 503, 504))))
+
+
+def _cache_path(symbol, start, end, timeframe):
+    return os.path.join(CACHE_DIR, "{}_{}_{}_{}.json".format(
+        symbol, timeframe, start, end))
+
+
+def fetch_bars(symbol, start, end, timeframe="5Min", use_cache=True):
     """
     Fetch historical bars from Alpaca with pagination.
     Returns list of bar dicts sorted by timestamp.
+    Completed windows (end before today) are cached under CACHE_DIR so
+    repeat backtest runs skip the network entirely.
     """
-    bars   = []
-    params = {
+    cache_file = _cache_path(symbol, start, end, timeframe)
+    cacheable  = use_cache and end < date.today().isoformat()
+    if cacheable and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                bars = fast_json.loads(f.read())
+            print("  Loaded {} cached bars for {} ({} to {})".format(
+                len(bars), symbol, start, end))
+            return bars
+        except Exception as e:
+            print("  Cache read failed for {}: {}".format(symbol, e))
+
+    bars     = []
+    complete = True
+    params   = {
         "start":     start + "T09:00:00Z",
         "end":       end   + "T23:59:00Z",
         "timeframe": timeframe,
@@ -74,16 +110,17 @@ def fetch_bars(symbol, start, end, timeframe="5Min"):
 
     while True:
         try:
-            r = requests.get(BARS_URL.format(symbol), headers=HEADERS,
-                             params=params, timeout=15)
+            r = SESSION.get(BARS_URL.format(symbol), params=params, timeout=15)
             if r.status_code != 200:
                 print("  ERROR fetching {}: HTTP {} {}".format(
                     symbol, r.status_code, r.text[:150]))
+                complete = False
                 break
 
-            data       = r.json()
+            data       = fast_json.loads(r.content)
             page_bars  = data.get("bars", [])
-            bars.extend(page_bars)
+            bars.extend({k: b[k] for k in BAR_FIELDS if k in b}
+                        for b in page_bars)
 
             next_token = data.get("next_page_token")
             if not next_token:
@@ -92,24 +129,52 @@ def fetch_bars(symbol, start, end, timeframe="5Min"):
 
         except Exception as e:
             print("  Exception fetching {}: {}".format(symbol, e))
+            complete = False
             break
 
     print("  Fetched {} bars for {} ({} to {})".format(
         len(bars), symbol, start, end))
+
+    # Only cache full, successful downloads
+    if cacheable and complete and bars:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump(bars, f)
+        except Exception as e:
+            print("  Cache write failed for {}: {}".format(symbol, e))
     return bars
 
 
-def group_by_date(bars):
-    """Group 5-min bars by trading date."""
-    grouped = defaultdict(list)
-    for b in bars:
-        # timestamp format: 2024-01-02T09:30:00Z
-        day = b["t"][:10]
-        grouped[day].append(b)
-    # Sort each day's bars by time
-    for day in grouped:
-        grouped[day].sort(key=lambda x: x["t"])
-    return grouped
+def bars_to_columns(bars):
+    """
+    Convert a timestamp-sorted bar list into columnar form once:
+    float64 arrays for h/l/v, the trading date of each bar, and a
+    boolean late-entry mask.
+    """
+    n = len(bars)
+    return {
+        "h":    np.fromiter((b["h"] for b in bars), dtype=np.float64, count=n),
+        "l":    np.fromiter((b["l"] for b in bars), dtype=np.float64, count=n),
+        "v":    np.fromiter((b["v"] for b in bars), dtype=np.float64, count=n),
+        "date": np.array([b["t"][:10] for b in bars]),
+        "late": np.fromiter((not late_entry_filter(b) for b in bars),
+                            dtype=bool, count=n),
+    }
+
+
+def session_bounds(dates):
+    """
+    Yield (date, start, end) for each run of equal dates in a sorted date
+    array. Boundaries come from one vectorized date-change comparison.
+    """
+    if len(dates) == 0:
+        return
+    cuts   = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+    starts = np.concatenate(([0], cuts))
+    ends   = np.concatenate((cuts, [len(dates)]))
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield str(dates[start]), start, end
 
 
 # =============================================
@@ -128,17 +193,6 @@ def gap_filter(day_bars, prev_close):
     return gap_pct <= GAP_FILTER_PCT
 
 
-def volume_confirmation(breakout_bar, recent_bars):
-    """
-    Return True if breakout bar volume exceeds 1.5x average of prior bars.
-    Confirms institutional participation.
-    """
-    if len(recent_bars) < 3:
-        return True
-    avg_vol = statistics.mean(b["v"] for b in recent_bars[-5:])
-    return breakout_bar["v"] >= avg_vol * VOL_CONFIRM_MULT
-
-
 def bar_time_et(bar_timestamp):
     """Extract HH:MM from bar timestamp (bars are in UTC, market hours offset)."""
     # Alpaca timestamps are UTC; ET is UTC-5 (EST) or UTC-4 (EDT)
@@ -158,18 +212,28 @@ def late_entry_filter(bar):
 # ATR-BASED POSITION SIZING
 # =============================================
 
-def calculate_atr(daily_bars, period=14):
-    """Calculate Average True Range over last N days."""
-    if len(daily_bars) < period + 1:
-        return None
-    trs = []
-    for i in range(1, len(daily_bars)):
-        high  = daily_bars[i]["h"]
-        low   = daily_bars[i]["l"]
-        prev  = daily_bars[i-1]["c"]
-        tr    = max(high - low, abs(high - prev), abs(low - prev))
-        trs.append(tr)
-    return statistics.mean(trs[-period:])
+def atr_by_prefix(daily_bars, period=14):
+    """
+    ATR for every prefix of daily_bars in one vectorized pass.
+    Element k is the ATR of daily_bars[:k] (mean true range of its last
+    `period` days); NaN where that prefix has fewer than period + 1 bars.
+    """
+    n   = len(daily_bars)
+    out = np.full(n + 1, np.nan)
+    if n < period + 1:
+        return out
+    high  = np.array([b["h"] for b in daily_bars], dtype=np.float64)
+    low   = np.array([b["l"] for b in daily_bars], dtype=np.float64)
+    close = np.array([b["c"] for b in daily_bars], dtype=np.float64)
+    # True range in one fused expression:
+    # max(h-l, |h-pc|, |l-pc|) == max(h, pc) - min(l, pc)
+    prev  = close[:-1]
+    tr    = np.maximum(high[1:], prev) - np.minimum(low[1:], prev)
+    # tr[j-1] is bar j's true range; prefix k averages bars k-period..k-1,
+    # taken as differences of one running sum
+    csum = np.concatenate(([0.0], np.cumsum(tr)))
+    out[period + 1:] = (csum[period:] - csum[:-period]) / period
+    return out
 
 
 def position_size_atr(account_size, risk_percent, atr):
@@ -189,8 +253,8 @@ def backtest_symbol(symbol, all_bars_5min, all_bars_daily):
     Run full ORB backtest for one symbol.
     Returns list of trade result dicts.
     """
-    grouped    = group_by_date(all_bars_5min)
-    dates      = sorted(grouped.keys())
+    bars       = sorted(all_bars_5min, key=lambda x: x["t"])
+    cols       = bars_to_columns(bars)
     trades     = []
     prev_close = None
     daily_r    = defaultdict(float)
@@ -201,10 +265,12 @@ def backtest_symbol(symbol, all_bars_5min, all_bars_daily):
         day = db["t"][:10]
         daily_closes[day] = db["c"]
 
-    daily_list = sorted(all_bars_daily, key=lambda x: x["t"])
+    daily_list  = sorted(all_bars_daily, key=lambda x: x["t"])
+    daily_dates = [b["t"][:10] for b in daily_list]
+    daily_atr   = atr_by_prefix(daily_list)
 
-    for date_str in dates:
-        day_bars = grouped[date_str]
+    for date_str, start, end in session_bounds(cols["date"]):
+        day_bars = bars[start:end]
 
         if len(day_bars) < ORB_BARS + 2:
             prev_close = daily_closes.get(date_str, prev_close)
@@ -216,92 +282,95 @@ def backtest_symbol(symbol, all_bars_5min, all_bars_daily):
             continue
 
         # ATR-based sizing: use daily bars up to this date
-        past_daily = [b for b in daily_list if b["t"][:10] < date_str]
-        atr        = calculate_atr(past_daily) if len(past_daily) >= 15 else None
+        past_count = bisect_left(daily_dates, date_str)
+        atr        = float(daily_atr[past_count]) if past_count >= 15 else None
         size       = position_size_atr(ACCOUNT_SIZE, RISK_PERCENT, atr) if atr else 100
 
         # Define ORB using first 30 min
-        orb        = day_bars[:ORB_BARS]
-        orb_high   = max(b["h"] for b in orb)
-        orb_low    = min(b["l"] for b in orb)
+        highs      = cols["h"][start:end]
+        lows       = cols["l"][start:end]
+        orb_high   = float(highs[:ORB_BARS].max())
+        orb_low    = float(lows[:ORB_BARS].min())
         range_size = orb_high - orb_low
 
         if range_size <= 0:
             prev_close = daily_closes.get(date_str, prev_close)
             continue
 
-        position = None
-        entry = stop = target = 0
-
-        for i in range(ORB_BARS, len(day_bars)):
-            bar = day_bars[i]
-
-            # Daily loss limit per symbol
-            if daily_r[date_str] <= MAX_DAILY_LOSS_R:
-                break
-
-            # Time filter: no late entries
-            if position is None and not late_entry_filter(bar):
-                break
+        # Daily loss limit per symbol
+        if daily_r[date_str] <= MAX_DAILY_LOSS_R:
+            prev_close = daily_closes.get(date_str, prev_close)
+            continue
 
-            # Entry: long breakout
-            if position is None and bar["h"] > orb_high:
-                if volume_confirmation(bar, day_bars[max(0, i-5):i]):
-                    position = "LONG"
-                    entry    = orb_high
-                    stop     = orb_low
-                    target   = entry + (range_size * RISK_MULTIPLIER)
-
-            # Entry: short breakout
-            elif position is None and bar["l"] < orb_low:
-                if volume_confirmation(bar, day_bars[max(0, i-5):i]):
-                    position = "SHORT"
-                    entry    = orb_low
-                    stop     = orb_high
-                    target   = entry - (range_size * RISK_MULTIPLIER)
-
-            # Exit logic
-            if position == "LONG":
-                if bar["l"] <= stop:
-                    r_mult = -1.0
-                    trades.append(_trade_record(
-                        symbol, date_str, position, entry, stop, target,
-                        r_mult, size, atr))
-                    daily_r[date_str] += r_mult
-                    position = None
-                    break
-                if bar["h"] >= target:
-                    r_mult = RISK_MULTIPLIER
-                    trades.append(_trade_record(
-                        symbol, date_str, position, entry, stop, target,
-                        r_mult, size, atr))
-                    daily_r[date_str] += r_mult
-                    position = None
-                    break
-
-            if position == "SHORT":
-                if bar["h"] >= stop:
-                    r_mult = -1.0
-                    trades.append(_trade_record(
-                        symbol, date_str, position, entry, stop, target,
-                        r_mult, size, atr))
-                    daily_r[date_str] += r_mult
-                    position = None
-                    break
-                if bar["l"] <= target:
-                    r_mult = RISK_MULTIPLIER
-                    trades.append(_trade_record(
-                        symbol, date_str, position, entry, stop, target,
-                        r_mult, size, atr))
-                    daily_r[date_str] += r_mult
-                    position = None
-                    break
+        outcome = _session_outcome(highs, lows, cols["v"][start:end],
+                                   cols["late"][start:end],
+                                   orb_high, orb_low, range_size)
+        if outcome:
+            direction, entry, stop, target, r_mult = outcome
+            trades.append(_trade_record(
+                symbol, date_str, direction, entry, stop, target,
+                r_mult, size, atr))
+            daily_r[date_str] += r_mult
 
         prev_close = daily_closes.get(date_str, prev_close)
 
     return trades
 
 
+def _session_outcome(highs, lows, vols, late, orb_high, orb_low, range_size):
+    """
+    Resolve one session's post-ORB bars in a single vectorized pass.
+    Entry is the first bar (before the late-entry cutoff) that breaks the
+    ORB with volume confirmation; exit is the first bar from entry onward
+    that touches stop or target (stop wins when both hit on one bar).
+    Takes the session's column views; returns
+    (direction, entry, stop, target, r_mult) or None.
+    """
+    # Only bars before the late-entry cutoff can open a trade, so the
+    # entry masks are built over that window alone
+    late   = late[ORB_BARS:]
+    cutoff = ORB_BARS + (int(np.argmax(late)) if late.any() else len(late))
+
+    # Volume confirmation against the mean of up to 5 prior bars
+    idx       = np.arange(ORB_BARS, cutoff)
+    first     = np.maximum(idx - 5, 0)
+    cum_vol   = np.concatenate(([0.0], np.cumsum(vols[:cutoff])))
+    avg_vol   = (cum_vol[idx] - cum_vol[first]) / np.maximum(idx - first, 1)
+    vol_ok    = (vols[idx] >= avg_vol * VOL_CONFIRM_MULT) | (idx - first < 3)
+
+    long_break  = highs[ORB_BARS:cutoff] > orb_high
+    short_break = ~long_break & (lows[ORB_BARS:cutoff] < orb_low)
+    entries     = (long_break | short_break) & vol_ok
+    if not entries.any():
+        return None
+    e = int(np.argmax(entries))
+
+    highs = highs[ORB_BARS:]
+    lows  = lows[ORB_BARS:]
+
+    if long_break[e]:
+        direction = "LONG"
+        entry     = orb_high
+        stop      = orb_low
+        target    = entry + (range_size * RISK_MULTIPLIER)
+        stop_hit  = lows[e:]  <= stop
+        tgt_hit   = highs[e:] >= target
+    else:
+        direction = "SHORT"
+        entry     = orb_low
+        stop      = orb_high
+        target    = entry - (range_size * RISK_MULTIPLIER)
+        stop_hit  = highs[e:] >= stop
+        tgt_hit   = lows[e:]  <= target
+
+    exits = stop_hit | tgt_hit
+    if not exits.any():
+        return None
+    x = int(np.argmax(exits))
+    r_mult = -1.0 if stop_hit[x] else RISK_MULTIPLIER
+    return direction, entry, stop, target, r_mult
+
+
 def _trade_record(symbol, date_str, direction, entry, stop, target,
                   r_mult, size, atr):
     return {
@@ -327,45 +396,43 @@ def compute_stats(trades, label="ALL"):
         print("  No trades in {} sample".format(label))
         return {}
 
-    rs        = [t["r_mult"] for t in trades]
-    wins      = [r for r in rs if r > 0]
-    losses    = [r for r in rs if r <= 0]
-    win_rate  = len(wins) / len(rs)
-
-    equity    = []
-    running   = 0
-    for r in rs:
-        running += r
-        equity.append(running)
+    # One float64 array of R-multiples; means/sums/stdev run in NumPy
+    rs        = np.fromiter((t["r_mult"] for t in trades), dtype=np.float64,
+                            count=len(trades))
+    wins      = rs[rs > 0]
+    losses    = rs[rs <= 0]
+    win_rate  = wins.size / rs.size
+
+    # Equity curve and drawdown in two reused buffers (no temporaries);
+    # peak starts at 0 so an opening losing streak counts as drawdown
+    n      = len(rs)
+    equity = np.empty(n)
+    peak   = np.empty(n)
+    np.cumsum(rs, out=equity)
+    np.maximum.accumulate(equity, out=peak)
+    np.maximum(peak, 0, out=peak)
+    np.subtract(equity, peak, out=peak)
+    max_dd = min(float(peak.min()), 0)
 
     import math
-    peak     = 0
-    max_dd   = 0
-    for e in equity:
-        if e > peak:
-            peak = e
-        dd = e - peak
-        if dd < max_dd:
-            max_dd = dd
-
-    avg_win  = statistics.mean(wins)  if wins   else 0
-    avg_loss = statistics.mean(losses) if losses else 0
-
-    gross_win  = sum(wins)
-    gross_loss = abs(sum(losses)) if losses else 1
+    avg_win  = float(wins.mean())   if wins.size   else 0
+    avg_loss = float(losses.mean()) if losses.size else 0
+
+    gross_win  = float(wins.sum())
+    gross_loss = abs(float(losses.sum())) if losses.size else 1
     profit_factor = gross_win / gross_loss if gross_loss else float("inf")
 
     # Sharpe ratio (annualised, assuming ~252 trading days)
-    if len(rs) > 1:
-        avg_r  = statistics.mean(rs)
-        std_r  = statistics.stdev(rs)
+    if rs.size > 1:
+        avg_r  = float(rs.mean())
+        std_r  = float(rs.std(ddof=1))
         sharpe = (avg_r / std_r) * math.sqrt(252) if std_r > 0 else 0
     else:
         sharpe = 0
 
     # Max consecutive losses
     max_consec = cur_consec = 0
-    for r in rs:
+    for r in rs.tolist():
         if r < 0:
             cur_consec += 1
             max_consec  = max(max_consec, cur_consec)
@@ -374,17 +441,17 @@ def compute_stats(trades, label="ALL"):
 
     return {
         "label":         label,
-        "trades":        len(rs),
+        "trades":        rs.size,
         "win_rate":      round(win_rate * 100, 1),
-        "avg_r":         round(statistics.mean(rs), 3),
-        "total_r":       round(sum(rs), 2),
+        "avg_r":         round(float(rs.mean()), 3),
+        "total_r":       round(float(rs.sum()), 2),
         "max_drawdown":  round(max_dd, 2),
         "profit_factor": round(profit_factor, 2),
         "sharpe":        round(sharpe, 2),
         "avg_win":       round(avg_win, 3),
         "avg_loss":      round(avg_loss, 3),
         "max_consec_loss": max_consec,
-        "equity_curve":  equity
+        "equity_curve":  equity.tolist()
     }
 
 
@@ -405,33 +472,40 @@ def monthly_breakdown(trades):
 # =============================================
 
 def print_stats(stats):
-    print("")
-    print("=" * 50)
-    print("  RESULTS: {}".format(stats["label"]))
-    print("=" * 50)
-    print("  Trades:            {}".format(stats["trades"]))
-    print("  Win Rate:          {}%".format(stats["win_rate"]))
-    print("  Avg R per trade:   {}".format(stats["avg_r"]))
-    print("  Total R:           {}".format(stats["total_r"]))
-    print("  Max Drawdown (R):  {}".format(stats["max_drawdown"]))
-    print("  Profit Factor:     {}".format(stats["profit_factor"]))
-    print("  Sharpe Ratio:      {}".format(stats["sharpe"]))
-    print("  Avg Win (R):       {}".format(stats["avg_win"]))
-    print("  Avg Loss (R):      {}".format(stats["avg_loss"]))
-    print("  Max Consec Losses: {}".format(stats["max_consec_loss"]))
-    print("=" * 50)
+    # Build the whole block and emit it in one write
+    lines = [
+        "",
+        "=" * 50,
+        "  RESULTS: {}".format(stats["label"]),
+        "=" * 50,
+        "  Trades:            {}".format(stats["trades"]),
+        "  Win Rate:          {}%".format(stats["win_rate"]),
+        "  Avg R per trade:   {}".format(stats["avg_r"]),
+        "  Total R:           {}".format(stats["total_r"]),
+        "  Max Drawdown (R):  {}".format(stats["max_drawdown"]),
+        "  Profit Factor:     {}".format(stats["profit_factor"]),
+        "  Sharpe Ratio:      {}".format(stats["sharpe"]),
+        "  Avg Win (R):       {}".format(stats["avg_win"]),
+        "  Avg Loss (R):      {}".format(stats["avg_loss"]),
+        "  Max Consec Losses: {}".format(stats["max_consec_loss"]),
+        "=" * 50,
+    ]
+    print("\n".join(lines))
 
 
 def print_monthly(trades):
     breakdown = monthly_breakdown(trades)
-    print("")
-    print("  MONTHLY BREAKDOWN")
-    print("  {:<10} {:>8} {:>8} {:>10}".format("Month", "Trades", "WinRate", "Total R"))
-    print("  " + "-" * 40)
+    lines = [
+        "",
+        "  MONTHLY BREAKDOWN",
+        "  {:<10} {:>8} {:>8} {:>10}".format("Month", "Trades", "WinRate", "Total R"),
+        "  " + "-" * 40,
+    ]
     for mo, d in breakdown.items():
         wr = round(d["wins"] / d["trades"] * 100, 1) if d["trades"] else 0
-        print("  {:<10} {:>8} {:>7}% {:>10}".format(
+        lines.append("  {:<10} {:>8} {:>7}% {:>10}".format(
             mo, d["trades"], wr, round(d["total_r"], 2)))
+    print("\n".join(lines))
 
 
 def save_trade_log(trades, filename=TRADE_LOG_FILE):
@@ -511,6 +585,18 @@ def walk_forward_split(trades):
 # MAIN
 # =============================================
 
+def run_symbol(symbol):
+    """
+    Fetch and backtest one symbol. Symbols are independent, so main()
+    runs these concurrently. Returns (symbol, trades or None if no data).
+    """
+    bars_5min  = fetch_bars(symbol, START_DATE, END_DATE, timeframe="5Min")
+    bars_daily = fetch_bars(symbol, START_DATE, END_DATE, timeframe="1Day")
+    if not bars_5min or not bars_daily:
+        return symbol, None
+    return symbol, backtest_symbol(symbol, bars_5min, bars_daily)
+
+
 def main():
     if not ALPACA_KEY or not ALPACA_SECRET:
         print("ERROR: Set APCA_API_KEY_ID and APCA_API_SECRET_KEY env vars before running")
@@ -526,19 +612,16 @@ def main():
 
     all_trades = []
 
-    for symbol in SYMBOLS:
-        print("")
-        print("Fetching {}...".format(symbol))
-        bars_5min = fetch_bars(symbol, START_DATE, END_DATE, timeframe="5Min")
-        bars_daily = fetch_bars(symbol, START_DATE, END_DATE, timeframe="1Day")
-
-        if not bars_5min or not bars_daily:
-            print("  Skipping {} - no data".format(symbol))
-            continue
-
-        trades = backtest_symbol(symbol, bars_5min, bars_daily)
-        print("  {} trades generated for {}".format(len(trades), symbol))
-        all_trades.extend(trades)
+    print("")
+    print("Fetching and backtesting {} symbols...".format(len(SYMBOLS)))
+    with ThreadPoolExecutor(max_workers=len(SYMBOLS)) as ex:
+        # map() keeps results in SYMBOLS order
+        for symbol, trades in ex.map(run_symbol, SYMBOLS):
+            if trades is None:
+                print("  Skipping {} - no data".format(symbol))
+                continue
+            print("  {} trades generated for {}".format(len(trades), symbol))
+            all_trades.extend(trades)
 
     if not all_trades:
         print("No trades generated. Check API keys and date range.")
@@ -1,16 +1,19 @@
 # risk_engine.py
 
+import numpy as np
+
 ACCOUNT_SIZE = 30000
 
+# Score tiers: below 70 -> 0%, 70+ -> 2%, 75+ -> 3%, 85+ -> 5%
+RISK_THRESHOLDS = np.array([70, 75, 85])
+RISK_PERCENTS   = np.array([0.0, 0.02, 0.03, 0.05])
+
 def get_risk_percent(score):
-    if score >= 85:
-        return 0.05
-    elif score >= 75:
-        return 0.03
-    elif score >= 70:
-        return 0.02
-    else:
-        return 0.0
+    # Scalar score -> float; array of scores -> array (one risk % each).
+    # NaN scores get 0%.
+    pct = RISK_PERCENTS[np.searchsorted(RISK_THRESHOLDS, score, side="right")]
+    pct = np.where(np.isnan(score), 0.0, pct)
+    return float(pct) if pct.ndim == 0 else pct
 
 
 def calculate_contracts(premium, score):